@@ -0,0 +1,99 @@
+import threading
+
+import numpy as np
+
+from doc_assistant.framework import get_framework
+
+
+def _membership(hallmarks, group_map):
+    """Hallmark x group 0/1 matrix for a {group: [hallmarks]} mapping"""
+    index = {h: i for i, h in enumerate(hallmarks)}
+    matrix = np.zeros((len(hallmarks), len(group_map)))
+    for j, members in enumerate(group_map.values()):
+        for h in members:
+            matrix[index[h], j] = 1.0
+    return matrix
+
+
+class GroupAggregator:
+    """Computes system change level and condition averages for one or many cases with one matrix multiply"""
+
+    def __init__(self, framework):
+        self.framework = framework
+        self.hallmarks = framework.titles
+        self.levels = tuple(framework.level_map.keys())
+        self.conditions = tuple(framework.condition_map.keys())
+        self._index = {h: i for i, h in enumerate(self.hallmarks)}
+        # Levels and conditions share one membership matrix so both are aggregated together
+        self.membership = np.hstack([
+            _membership(self.hallmarks, framework.level_map),
+            _membership(self.hallmarks, framework.condition_map),
+        ])
+
+    def score_matrix(self, cases):
+        """Return (values, present) case x hallmark arrays; missing or non-numeric scores are not present"""
+        values = np.zeros((len(cases), len(self.hallmarks)))
+        present = np.zeros((len(cases), len(self.hallmarks)))
+        for i, scores in enumerate(cases):
+            for h, v in scores.items():
+                j = self._index.get(h)
+                if j is None or v is None:
+                    continue
+                try:
+                    values[i, j] = float(v)
+                except (TypeError, ValueError):
+                    continue
+                present[i, j] = 1.0
+        return values, present
+
+    def group_means(self, cases):
+        """Return a case x (levels + conditions) array of average scores, 0 for groups with no scores"""
+        values, present = self.score_matrix(cases)
+        sums = values @ self.membership
+        counts = present @ self.membership
+        means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+        return np.round(means, 2)
+
+    def split(self, means):
+        """Split group_means output into (level means, condition means) along the last axis"""
+        n = len(self.levels)
+        return means[..., :n], means[..., n:]
+
+    def view_matrix(self, cases, view='hallmark'):
+        """Return (labels, case x label array) for the hallmark, level or condition view; missing hallmark scores are NaN"""
+        if view == 'hallmark':
+            values, present = self.score_matrix(cases)
+            return self.hallmarks, np.where(present > 0, values, np.nan)
+        levels, conditions = self.split(self.group_means(cases))
+        if view == 'level':
+            return self.levels, levels
+        if view == 'condition':
+            return self.conditions, conditions
+        raise ValueError(f"Unsupported comparison view: {view}")
+
+    @staticmethod
+    def percentile_bands(values, percentiles=(10, 25, 50, 75, 90)):
+        """Return {percentile: per-column value} across cases, ignoring NaN; columns with no scores are 0"""
+        values = np.array(values, dtype=float)
+        values[:, np.isnan(values).all(axis=0)] = 0.0
+        bands = np.nanpercentile(values, percentiles, axis=0)
+        return {p: np.round(band, 2) for p, band in zip(percentiles, bands)}
+
+    def level_condition_means(self, scores):
+        """Return ([level means], [condition means]) for a single case's {hallmark: score} dict"""
+        levels, conditions = self.split(self.group_means([scores])[0])
+        return levels.tolist(), conditions.tolist()
+
+
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+
+def get_aggregator():
+    """Return the aggregator for the current framework, rebuilt only when the framework reloads"""
+    global _aggregator
+    framework = get_framework()
+    with _aggregator_lock:
+        if _aggregator is None or _aggregator.framework is not framework:
+            _aggregator = GroupAggregator(framework)
+        return _aggregator
@@ -0,0 +1,143 @@
+"""Headless batch evaluation of case documents.
+
+Usage:
+    python -m doc_assistant.batch INPUT_DIR [--max-concurrency 4] [--overwrite]
+
+Every .txt/.docx/.pdf file directly under INPUT_DIR becomes one case named after the
+file; every sub-directory becomes one case built from all supported files inside it,
+mirroring a multi-file upload on the Evaluate page. Each result is written to the case
+store as soon as it completes, and cases already in the store are skipped, so an
+interrupted run resumes where it stopped.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from doc_assistant.case_store import CaseStore, DEFAULT_DB_PATH
+from doc_assistant.document_processor import DocumentProcessor
+from doc_assistant.evaluation_table import result_to_dataframe
+from doc_assistant.llm_service import AsyncLLMService, RequestGovernor
+from doc_assistant.tokenizer import TokenizedDocument
+
+SUPPORTED_TYPES = ('txt', 'docx', 'pdf')
+MAX_DOCUMENT_TOKENS = 100_000
+
+
+def _file_type(path):
+    return path.rsplit('.', 1)[-1].lower() if '.' in path else ''
+
+
+def discover_cases(input_dir, prefix=''):
+    """Return [(case_name, [file paths])] for the files and sub-directories of input_dir"""
+    cases = []
+    for entry in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, entry)
+        if os.path.isdir(path):
+            files = [
+                os.path.join(path, f) for f in sorted(os.listdir(path))
+                if os.path.isfile(os.path.join(path, f)) and _file_type(f) in SUPPORTED_TYPES
+            ]
+            if files:
+                cases.append((prefix + entry, files))
+        elif _file_type(entry) in SUPPORTED_TYPES:
+            cases.append((prefix + os.path.splitext(entry)[0], [path]))
+    return cases
+
+
+def extract_case_text(processor, paths):
+    """Extract and join the text of all files of one case, in file order"""
+    parts = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            parts.append(processor.process_user_document(f.read(), _file_type(path)))
+    return '\n\n'.join(parts)
+
+
+def _extract_and_tokenize(processor, paths, model_name):
+    return TokenizedDocument(extract_case_text(processor, paths), model_name=model_name)
+
+
+async def evaluate_case(case_name, paths, processor, llm_service, store, max_tokens):
+    """Extract, evaluate and store one case; returns the overall score"""
+    doc = await asyncio.to_thread(_extract_and_tokenize, processor, paths, llm_service.model)
+    if doc.total_tokens > max_tokens:
+        raise ValueError(f"document has {doc.total_tokens:,} tokens, above the {max_tokens:,} token limit")
+    # Rate limiting and retries are handled by the service's shared RequestGovernor
+    result = await llm_service.aget_evaluation(
+        processor.prepare_prompt(doc.text),
+        prompt_tokens=processor.prompt_builder.framework_tokens + doc.total_tokens
+    )
+    if not isinstance(result.get('scores'), dict):
+        raise ValueError("LLM returned scores in incorrect format")
+    table_html = result_to_dataframe(result).to_html(index=False, escape=False)
+    store.save_case(case_name, result['scores'], table_html)
+    return result.get('overall_score')
+
+
+async def run_batch(input_dir, store, llm_service, processor, overwrite=False, prefix='',
+                    max_tokens=MAX_DOCUMENT_TOKENS):
+    """Evaluate every case found in input_dir; returns (done, skipped, failed) lists of case names"""
+    cases = discover_cases(input_dir, prefix=prefix)
+    pending, skipped = [], []
+    for name, paths in cases:
+        if overwrite or not store.exists(name):
+            pending.append((name, paths))
+        else:
+            skipped.append(name)
+    semaphore = asyncio.Semaphore(llm_service.max_concurrency)
+    done, failed = [], []
+    print(f"{len(cases)} cases found, {len(skipped)} already evaluated, {len(pending)} to evaluate", flush=True)
+
+    async def run_one(name, paths):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                score = await evaluate_case(name, paths, processor, llm_service, store, max_tokens)
+            except Exception as e:
+                failed.append(name)
+                print(f"[failed] {name}: {e}", file=sys.stderr, flush=True)
+                return
+            done.append(name)
+            print(f"[{len(done) + len(failed)}/{len(pending)}] {name}: overall score {score} "
+                  f"({time.perf_counter() - started:.1f}s)", flush=True)
+
+    await asyncio.gather(*(run_one(name, paths) for name, paths in pending))
+    return done, skipped, failed
+
+
+async def _main(args):
+    store = CaseStore(args.db)
+    processor = DocumentProcessor()
+    governor = RequestGovernor(
+        requests_per_minute=args.rpm, tokens_per_minute=args.tpm, max_retries=args.max_retries
+    )
+    async with AsyncLLMService(governor=governor, max_concurrency=args.max_concurrency) as llm_service:
+        return await run_batch(
+            args.input_dir, store, llm_service, processor,
+            overwrite=args.overwrite, prefix=args.prefix, max_tokens=args.max_tokens,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate a folder of case documents into the case store")
+    parser.add_argument('input_dir', help="directory of .txt/.docx/.pdf files or per-case sub-directories")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="case store database path")
+    parser.add_argument('--max-concurrency', type=int, default=4, help="maximum cases evaluated at once")
+    parser.add_argument('--max-tokens', type=int, default=MAX_DOCUMENT_TOKENS, help="per-case document token limit")
+    parser.add_argument('--max-retries', type=int, default=6, help="retries per case on rate limits and timeouts")
+    parser.add_argument('--rpm', type=int, default=None, help="deployment quota in requests per minute")
+    parser.add_argument('--tpm', type=int, default=None, help="deployment quota in tokens per minute")
+    parser.add_argument('--prefix', default='', help="prefix added to every case name")
+    parser.add_argument('--overwrite', action='store_true', help="re-evaluate cases already in the store")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.input_dir):
+        parser.error(f"{args.input_dir} is not a directory")
+    done, skipped, failed = asyncio.run(_main(args))
+    print(f"Evaluated {len(done)}, skipped {len(skipped)}, failed {len(failed)}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
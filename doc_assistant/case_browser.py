@@ -0,0 +1,98 @@
+import pandas as pd
+import streamlit as st
+
+SORT_OPTIONS = {
+    "Upload time": 'upload_time',
+    "Overall score": 'overall_score',
+    "Name": 'name',
+}
+
+
+def _show_case(store, key, case_name, page_size):
+    """Point the browser's widgets at case_name before they are drawn: clear filters that hide it and turn to its page"""
+    sort = SORT_OPTIONS[st.session_state.get(f'{key}_sort', next(iter(SORT_OPTIONS)))]
+    descending = st.session_state.get(f'{key}_descending', True)
+    position = store.case_position(
+        case_name, st.session_state.get(f'{key}_query', '').strip(), st.session_state.get(f'{key}_prefix', '').strip(),
+        sort=sort, descending=descending
+    )
+    if position is None:
+        st.session_state[f'{key}_query'] = ''
+        st.session_state[f'{key}_prefix'] = ''
+        position = store.case_position(case_name, sort=sort, descending=descending)
+    if position is None:
+        return
+    st.session_state[f'{key}_page'] = position // page_size + 1
+    st.session_state[f'{key}_pick'] = case_name
+
+
+def case_browser(store, key, multi=False, page_size=25, preselect=None):
+    """Search, sort and page through stored cases, loading only the visible page from the store.
+
+    Returns the selected case name (or None), or with multi=True the list of names selected across pages.
+    preselect (single mode) selects that case, clearing filters and turning pages as needed to show it.
+    """
+    if preselect is not None and not multi:
+        _show_case(store, key, preselect, page_size)
+    search_col, prefix_col, sort_col, order_col = st.columns([3, 2, 2, 1])
+    query = search_col.text_input("Search cases", key=f'{key}_query').strip()
+    prefix = prefix_col.text_input("Name prefix", key=f'{key}_prefix').strip()
+    sort_label = sort_col.selectbox("Sort by", list(SORT_OPTIONS), key=f'{key}_sort')
+    descending = order_col.checkbox("Descending", value=True, key=f'{key}_descending')
+
+    total = store.count_cases(query, prefix)
+    pages = max(1, -(-total // page_size))
+    page_key = f'{key}_page'
+    # Filters can shrink the result set below the page the user was on
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key) if pages > 1 else 1
+    st.caption(f"{total} matching cases, page {page} of {pages}")
+
+    rows = store.search_cases(
+        query, prefix, sort=SORT_OPTIONS[sort_label], descending=descending,
+        limit=page_size, offset=(page - 1) * page_size
+    )
+    names = [r['name'] for r in rows]
+    if rows:
+        st.dataframe(
+            pd.DataFrame(rows).rename(columns={
+                'name': 'Case', 'upload_time': 'Uploaded', 'overall_score': 'Overall Score'
+            }),
+            hide_index=True, use_container_width=True
+        )
+
+    if not multi:
+        # A previous pick that is no longer on this page would make the selectbox reject its own state
+        if st.session_state.get(f'{key}_pick') not in names:
+            st.session_state.pop(f'{key}_pick', None)
+        return st.selectbox("Select a case", names, key=f'{key}_pick') if names else None
+
+    # The selection lives in session state so it survives paging; options are the current page plus the selection
+    selection_key = f'{key}_selection'
+    pick_key = f'{key}_pick'
+    selection = st.session_state.get(selection_key, [])
+    options = list(dict.fromkeys(selection + names))
+    st.session_state[pick_key] = selection
+
+    def _keep_selection():
+        st.session_state[selection_key] = st.session_state[pick_key]
+
+    def _add_to_selection(new_names):
+        st.session_state[selection_key] = list(dict.fromkeys(st.session_state.get(selection_key, []) + new_names))
+
+    def _add_all_matching():
+        rows = store.search_cases(query, prefix, sort=SORT_OPTIONS[sort_label], descending=descending, limit=None)
+        _add_to_selection([r['name'] for r in rows])
+
+    def _clear_selection():
+        st.session_state[selection_key] = []
+
+    page_col, all_col, clear_col = st.columns(3)
+    page_col.button("Add this page", key=f'{key}_add_page', on_click=_add_to_selection, args=(names,),
+                    disabled=not names)
+    all_col.button(f"Select all {total} matching", key=f'{key}_add_all', on_click=_add_all_matching,
+                   disabled=not total)
+    clear_col.button("Clear selection", key=f'{key}_clear', on_click=_clear_selection, disabled=not selection)
+    st.multiselect("Selected cases", options, key=pick_key, on_change=_keep_selection)
+    return selection
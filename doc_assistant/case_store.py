@@ -0,0 +1,242 @@
+import os
+import pickle
+import sqlite3
+import threading
+from datetime import datetime
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache')
+DEFAULT_DB_PATH = os.path.join(CACHE_DIR, 'cases.db')
+LEGACY_PICKLE_PATH = os.path.join(CACHE_DIR, 'case_cache.pkl')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    upload_time TEXT NOT NULL,
+    overall_score REAL
+);
+CREATE INDEX IF NOT EXISTS idx_cases_upload_time ON cases(upload_time);
+CREATE INDEX IF NOT EXISTS idx_cases_overall_score ON cases(overall_score);
+CREATE TABLE IF NOT EXISTS case_scores (
+    case_id INTEGER NOT NULL REFERENCES cases(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    hallmark TEXT NOT NULL,
+    score NUMERIC,
+    PRIMARY KEY (case_id, hallmark)
+);
+CREATE TABLE IF NOT EXISTS case_tables (
+    case_id INTEGER PRIMARY KEY REFERENCES cases(id) ON DELETE CASCADE,
+    table_html TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+# Names bound per IN (...) query
+MAX_QUERY_PARAMS = 500
+
+# Sort keys accepted by search_cases, mapped to their ORDER BY columns
+SORT_COLUMNS = {
+    'upload_time': 'upload_time',
+    'overall_score': 'overall_score',
+    'name': 'name COLLATE NOCASE',
+}
+
+
+def _like_escape(text):
+    """Escape LIKE wildcards so user input matches literally"""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _search_filter(query, prefix):
+    """WHERE clause and parameters for a case-insensitive name substring and prefix filter"""
+    clauses, params = [], []
+    if query:
+        clauses.append("name LIKE ? ESCAPE '\\'")
+        params.append(f'%{_like_escape(query)}%')
+    if prefix:
+        clauses.append("name LIKE ? ESCAPE '\\'")
+        params.append(f'{_like_escape(prefix)}%')
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def _order_by(sort, descending):
+    """ORDER BY clause for a SORT_COLUMNS key; ties fall back to insertion order in the same direction"""
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Unsupported sort key: {sort}")
+    direction = 'DESC' if descending else 'ASC'
+    return f'{SORT_COLUMNS[sort]} {direction}, id {direction}'
+
+
+def _overall_score(scores):
+    """Average the numeric hallmark scores, or None if there are none"""
+    values = []
+    for v in scores.values():
+        try:
+            values.append(float(v))
+        except (TypeError, ValueError):
+            continue
+    return round(sum(values) / len(values), 2) if values else None
+
+
+class CaseStore:
+    """SQLite-backed store of evaluated cases, their hallmark scores and rendered tables"""
+
+    def __init__(self, path=DEFAULT_DB_PATH, legacy_pickle_path=LEGACY_PICKLE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+        if legacy_pickle_path:
+            self.migrate_from_pickle(legacy_pickle_path)
+
+    def migrate_from_pickle(self, pickle_path):
+        """Import cases from the legacy case_cache.pkl once; returns the number of cases imported"""
+        if not os.path.exists(pickle_path):
+            return 0
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'migrated_pickle'"
+            ).fetchone()
+        if done:
+            return 0
+        with open(pickle_path, 'rb') as f:
+            cache = pickle.load(f)
+        imported = 0
+        with self._lock, self._conn:
+            for name, entry in cache.items():
+                if self._case_id(name) is not None:
+                    continue
+                self._insert_case(
+                    name,
+                    entry.get('score', {}),
+                    entry.get('table_html'),
+                    entry.get('upload_time') or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                )
+                imported += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_pickle', ?)",
+                (os.path.abspath(pickle_path),)
+            )
+        return imported
+
+    def _case_id(self, name):
+        row = self._conn.execute('SELECT id FROM cases WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+
+    def _insert_case(self, name, scores, table_html, upload_time):
+        """Upsert one case row with its scores and table; caller holds the lock and transaction"""
+        self._conn.execute(
+            'INSERT INTO cases (name, upload_time, overall_score) VALUES (?, ?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET upload_time = excluded.upload_time, '
+            'overall_score = excluded.overall_score',
+            (name, upload_time, _overall_score(scores))
+        )
+        case_id = self._case_id(name)
+        self._conn.execute('DELETE FROM case_scores WHERE case_id = ?', (case_id,))
+        self._conn.executemany(
+            'INSERT INTO case_scores (case_id, position, hallmark, score) VALUES (?, ?, ?, ?)',
+            [(case_id, i, h, s) for i, (h, s) in enumerate(scores.items())]
+        )
+        self._conn.execute(
+            'INSERT OR REPLACE INTO case_tables (case_id, table_html) VALUES (?, ?)',
+            (case_id, table_html)
+        )
+
+    def save_case(self, case_name, scores, table_html, upload_time=None):
+        """Insert or replace a single case"""
+        upload_time = upload_time or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock, self._conn:
+            self._insert_case(case_name, scores, table_html, upload_time)
+
+    def exists(self, case_name):
+        with self._lock:
+            return self._case_id(case_name) is not None
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM cases').fetchone()[0]
+
+    def list_case_names(self):
+        """Return case names in upload order"""
+        with self._lock:
+            rows = self._conn.execute('SELECT name FROM cases ORDER BY upload_time, id').fetchall()
+        return [r[0] for r in rows]
+
+    def count_cases(self, query='', prefix=''):
+        """Number of cases whose name contains query and starts with prefix"""
+        where, params = _search_filter(query, prefix)
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM cases{where}', params).fetchone()[0]
+
+    def search_cases(self, query='', prefix='', sort='upload_time', descending=True, limit=25, offset=0):
+        """Return one page of [{name, upload_time, overall_score}] matching the filter, sorted in SQL;
+        limit=None returns every match"""
+        where, params = _search_filter(query, prefix)
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT name, upload_time, overall_score FROM cases{where} '
+                f'ORDER BY {_order_by(sort, descending)} LIMIT ? OFFSET ?',
+                params + [-1 if limit is None else limit, offset]
+            ).fetchall()
+        return [{'name': n, 'upload_time': t, 'overall_score': s} for n, t, s in rows]
+
+    def case_position(self, case_name, query='', prefix='', sort='upload_time', descending=True):
+        """Zero-based position of a case among the filtered, sorted cases, or None if the filter excludes it"""
+        where, params = _search_filter(query, prefix)
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT position FROM (SELECT name, ROW_NUMBER() OVER (ORDER BY {_order_by(sort, descending)}) - 1 '
+                f'AS position FROM cases{where}) WHERE name = ?',
+                params + [case_name]
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_scores(self, case_names):
+        """Return {case_name: {hallmark: score}} for the selected cases only, in the given order"""
+        case_names = list(case_names)
+        if not case_names:
+            return {}
+        rows = []
+        with self._lock:
+            # Batched so large selections stay under SQLite's host-parameter limit (999 on older builds)
+            for i in range(0, len(case_names), MAX_QUERY_PARAMS):
+                batch = case_names[i:i + MAX_QUERY_PARAMS]
+                rows += self._conn.execute(
+                    'SELECT c.name, s.hallmark, s.score FROM cases c '
+                    'JOIN case_scores s ON s.case_id = c.id '
+                    f"WHERE c.name IN ({','.join('?' * len(batch))}) ORDER BY c.id, s.position",
+                    batch
+                ).fetchall()
+        scores = {name: {} for name in case_names}
+        found = set()
+        for name, hallmark, score in rows:
+            scores[name][hallmark] = score
+            found.add(name)
+        return {name: s for name, s in scores.items() if name in found}
+
+    def get_table_html(self, case_name):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT t.table_html FROM cases c JOIN case_tables t ON t.case_id = c.id WHERE c.name = ?',
+                (case_name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def rename_case(self, old_name, new_name):
+        """Rename a case; raises ValueError if the new name is taken"""
+        with self._lock, self._conn:
+            if self._case_id(new_name) is not None:
+                raise ValueError(f"Case name '{new_name}' already exists.")
+            self._conn.execute('UPDATE cases SET name = ? WHERE name = ?', (new_name, old_name))
+
+    def delete_case(self, case_name):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM cases WHERE name = ?', (case_name,))
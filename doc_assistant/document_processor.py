@@ -1,24 +1,41 @@
-﻿import json
-from pathlib import Path
-from docx import Document
-import io
-import pdfplumber
-import tiktoken
-import streamlit as st
-import os
+﻿import streamlit as st
+from collections import defaultdict
+from doc_assistant.docx_reader import iter_docx_blocks
+from doc_assistant.extraction import iter_pdf_pages
+from doc_assistant.framework import get_framework
+from doc_assistant.page_cache import PageTextCache
+from doc_assistant.pipeline import evaluate_chunks
+from doc_assistant.pdf_backends import DEFAULT_PDF_BACKENDS
+from doc_assistant.prompt_builder import PromptBuilder
+from doc_assistant.summarizer import HallmarkSummarizer
+from doc_assistant.tokenizer import TokenizedDocument
 
 class DocumentProcessor:
-    def __init__(self):
-        self.criteria = self._load_criteria()
-        
-    def _load_criteria(self):
-        """Load criteria file"""
-        criteria_path = Path(os.path.join(os.path.dirname(os.path.dirname(__file__)), "input_files", "combined_hallmarks.json"))
-        if not criteria_path.exists():
-            raise FileNotFoundError("combined_hallmarks.json not found in input_files directory")
-            
-        with open(criteria_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    def __init__(self, framework_format='minified', page_cache=None, max_pdf_processes=None,
+                 pdf_backends=DEFAULT_PDF_BACKENDS):
+        self.framework_format = framework_format
+        # Extracted PDF page text, reused when the same file is uploaded again
+        self.page_cache = page_cache if page_cache is not None else PageTextCache()
+        self.max_pdf_processes = max_pdf_processes
+        # Fast backend first; later backends only re-extract pages whose text comes out as garbage
+        self.pdf_backends = pdf_backends
+        self._framework = None
+        self._prompt_builder = None
+
+    @property
+    def criteria(self):
+        """Hallmark criteria from the shared framework registry"""
+        return get_framework().criteria
+
+    @property
+    def prompt_builder(self):
+        """Prompt builder for the current framework, rebuilt only when the framework files change"""
+        framework = get_framework()
+        if framework is not self._framework:
+            # Framework text is rendered once here instead of being re-serialised for every prompt
+            self._prompt_builder = PromptBuilder(framework.criteria, framework_format=self.framework_format)
+            self._framework = framework
+        return self._prompt_builder
     
     def process_user_document(self, file_content, file_type):
         """Process user uploaded document"""
@@ -31,72 +48,65 @@ class DocumentProcessor:
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
     
+    def iter_docx_blocks(self, file_content):
+        """Yield docx paragraphs and table rows in document order, then notes, headers and footers"""
+        return iter_docx_blocks(file_content)
+
     def _process_docx(self, file_content):
         """Process docx file"""
         try:
-            # Convert file content to BytesIO object
-            docx_file = io.BytesIO(file_content)
-            # Use python-docx to open document
-            doc = Document(docx_file)
-            # Extract text from all paragraphs
-            full_text = []
-            for para in doc.paragraphs:
-                if para.text.strip():  # Only add non-empty paragraphs
-                    full_text.append(para.text)
-            return '\n'.join(full_text)
+            return '\n'.join(self.iter_docx_blocks(file_content))
         except Exception as e:
             raise ValueError(f"Error processing docx file: {str(e)}")
     
+    def iter_pdf_pages(self, file_content):
+        """Yield pdf page text in page order as it becomes available"""
+        return iter_pdf_pages(
+            file_content, cache=self.page_cache, max_processes=self.max_pdf_processes, backends=self.pdf_backends
+        )
+
     def _process_pdf(self, file_content):
         """Process pdf file, extract all page text"""
         try:
-            pdf_file = io.BytesIO(file_content)
-            text = []
-            with pdfplumber.open(pdf_file) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text.append(page_text)
-            return '\n'.join(text)
+            return '\n'.join(text for text in self.iter_pdf_pages(file_content) if text)
         except Exception as e:
             raise ValueError(f"Error processing pdf file: {str(e)}")
     
-    def split_text(self, text, max_tokens=2000, model_name='gpt-4o'):
+    def split_text(self, text, max_tokens=2000, model_name='gpt-4o', content_defined=False):
         """Split long text into chunks by maximum token number"""
-        enc = tiktoken.encoding_for_model(model_name)
-        lines = text.split('\n')
-        blocks = []
-        current = []
-        token_count = 0
-        for line in lines:
-            line_tokens = len(enc.encode(line))
-            if token_count + line_tokens > max_tokens and current:
-                blocks.append('\n'.join(current))
-                current = []
-                token_count = 0
-            current.append(line)
-            token_count += line_tokens
-        if current:
-            blocks.append('\n'.join(current))
-        return blocks
+        if not isinstance(text, TokenizedDocument):
+            text = TokenizedDocument(text, model_name=model_name)
+        return text.split(max_tokens=max_tokens, content_defined=content_defined)
 
-    def process_long_document(self, user_doc, llm_service, max_tokens=2000, model_name='gpt-4o'):
+    def process_long_document(self, user_doc, llm_service, max_tokens=2000, model_name='gpt-4o', max_workers=4):
         """Chunk-wise evaluation of long documents, aggregate results, and recursively summarize Justification/Indicators"""
-        blocks = self.split_text(user_doc, max_tokens=max_tokens, model_name=model_name)
+        if isinstance(user_doc, (str, TokenizedDocument)):
+            # Content-defined boundaries keep unedited sections in identical chunks across document revisions,
+            # so their cached evaluations are reused and only changed chunks reach the LLM
+            blocks = self.split_text(user_doc, max_tokens=max_tokens, model_name=model_name, content_defined=True)
+        else:
+            # Already a stream of token-bounded chunks, e.g. from doc_assistant.pipeline.iter_chunks
+            blocks = user_doc
         chunk_results = []
-        for i, block in enumerate(blocks):
-            prompt = self.prepare_prompt(block)
-            result = llm_service.get_evaluation(prompt)
-            chunk_results.append(result)
-            # Output intermediate results for each chunk, for debugging
+        stats = {}
+        for i, (block, result) in enumerate(evaluate_chunks(blocks, self, llm_service, max_workers, stats)):
+            # Output intermediate results for each chunk as it arrives, for debugging
             st.subheader(f"[DEBUG] Chunk {i+1} Evaluation Result")
             st.write(result)
+            chunk_results.append(result)
+        st.caption(f"Reused {stats['reused']} of {stats['chunks']} chunk evaluations from the cache")
         # Aggregate scores, justification/indicators
-        from collections import defaultdict
         hallmark_scores = defaultdict(list)
         hallmark_justifications = defaultdict(list)
         hallmark_indicators = defaultdict(list)
         for chunk in chunk_results:
+            if chunk.get('hallmarks'):
+                # Structured responses need no table parsing
+                for h in chunk['hallmarks']:
+                    hallmark_scores[h['title']].append(float(h['score']))
+                    hallmark_justifications[h['title']].append(h['justification'])
+                    hallmark_indicators[h['title']].append(h['indicators'])
+                continue
             table_md = chunk['table']
             # Parse table, get hallmark title order
             lines = [line for line in table_md.split('\n') if '|' in line and not line.strip().startswith('|--')]
@@ -112,35 +122,13 @@ class DocumentProcessor:
                         hallmark_scores[hallmark].append(score)
                         hallmark_justifications[hallmark].append(justification)
                         hallmark_indicators[hallmark].append(indicators)
-        # Calculate maximum score, concatenate justification/indicators
+        # Calculate maximum score, then summarize all hallmarks' justification/indicators in a few batched calls
         final_scores = {h: max(v) for h, v in hallmark_scores.items() if v}
-        final_justifications = {h: ' '.join(justs) for h, justs in hallmark_justifications.items()}
-        final_indicators = {h: ' '.join(inds) for h, inds in hallmark_indicators.items()}
-        # Recursively summarize justification/indicators
-        for h in final_justifications:
-            prompt = f"Please summarize the evaluation reasons for {h} in a concise manner: \n{final_justifications[h]}"
-            summary = llm_service.get_evaluation(prompt)
-            if isinstance(summary, dict) and 'table' in summary:
-                final_justifications[h] = summary['table']
-            else:
-                final_justifications[h] = str(summary)
-        for h in final_indicators:
-            prompt = f"Please summarize the suggested indicators for {h} in a concise manner: \n{final_indicators[h]}"
-            summary = llm_service.get_evaluation(prompt)
-            if isinstance(summary, dict) and 'table' in summary:
-                final_indicators[h] = summary['table']
-            else:
-                final_indicators[h] = str(summary)
+        final_justifications, final_indicators = HallmarkSummarizer(
+            llm_service, max_workers=max_workers
+        ).summarize(hallmark_justifications, hallmark_indicators)
         return final_scores, final_justifications, final_indicators
 
     def prepare_prompt(self, user_doc):
         """Prepare prompt to send to LLM"""
-        prompt = f"""Please evaluate the following case using the provided framework:
-
-        Evaluation Framework (Hallmarks):
-        {json.dumps(self.criteria, ensure_ascii=False, indent=2)}
-
-        Case Document:
-        {user_doc}
-        """
-        return prompt
+        return self.prompt_builder.build(user_doc)
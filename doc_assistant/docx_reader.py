@@ -0,0 +1,95 @@
+import fnmatch
+import io
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+BODY_PART = 'word/document.xml'
+# Secondary parts, emitted after the body in this order
+NOTE_PARTS = ('word/footnotes.xml', 'word/endnotes.xml')
+HEADER_FOOTER_PATTERNS = ('word/header*.xml', 'word/footer*.xml')
+# Separator between the cells of a table row
+CELL_SEPARATOR = ' | '
+
+
+def _paragraph_text(paragraph):
+    """Text of a w:p the way python-docx reports it: runs joined, tabs and breaks kept"""
+    parts = []
+    for el in paragraph.iter():
+        if el.tag == W + 't':
+            parts.append(el.text or '')
+        elif el.tag == W + 'tab':
+            parts.append('\t')
+        elif el.tag in (W + 'br', W + 'cr'):
+            parts.append('\n')
+        elif el.tag == W + 'noBreakHyphen':
+            parts.append('-')
+    return ''.join(parts)
+
+
+def iter_part_blocks(stream):
+    """Yield the non-empty paragraphs and table rows of one WordprocessingML part in document order.
+
+    Table rows are yielded as their cells joined by CELL_SEPARATOR; a table nested in a cell is
+    folded into that cell's text. Elements are cleared once read so memory stays bounded.
+    """
+    # Stacks of the open table rows (lists of cell texts) and open cells (lists of paragraph texts)
+    rows, cells = [], []
+    container = None
+    for event, el in iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            # The first element under the root (w:body, or the root itself for notes and headers)
+            if container is None and el.tag in (W + 'body', W + 'footnotes', W + 'endnotes', W + 'hdr', W + 'ftr'):
+                container = el
+            elif el.tag == W + 'tr':
+                rows.append([])
+            elif el.tag == W + 'tc':
+                cells.append([])
+            continue
+        if el.tag == W + 'p':
+            text = _paragraph_text(el)
+            el.clear()
+            if cells:
+                if text.strip():
+                    cells[-1].append(text)
+            elif text.strip():
+                yield text
+        elif el.tag == W + 'tc':
+            cell = ' '.join(cells.pop())
+            if rows:
+                rows[-1].append(cell)
+        elif el.tag == W + 'tr':
+            row = rows.pop()
+            el.clear()
+            if any(cell.strip() for cell in row):
+                text = CELL_SEPARATOR.join(row)
+                if cells:
+                    cells[-1].append(text)
+                else:
+                    yield text
+        # Drop finished top-level blocks from the tree
+        if container is not None and not rows and not cells and el.tag in (W + 'p', W + 'tbl', W + 'sdt'):
+            container.clear()
+
+
+def iter_docx_blocks(file_content, include_notes=True, include_headers=True):
+    """Yield docx text blocks: body paragraphs and table rows, then footnotes/endnotes, then distinct header/footer lines"""
+    with zipfile.ZipFile(io.BytesIO(file_content)) as archive:
+        names = archive.namelist()
+        with archive.open(BODY_PART) as stream:
+            yield from iter_part_blocks(stream)
+        if include_notes:
+            for part in NOTE_PARTS:
+                if part in names:
+                    with archive.open(part) as stream:
+                        yield from iter_part_blocks(stream)
+        if include_headers:
+            # Headers and footers repeat per section; each distinct line is emitted once
+            seen = set()
+            for pattern in HEADER_FOOTER_PATTERNS:
+                for part in sorted(fnmatch.filter(names, pattern)):
+                    with archive.open(part) as stream:
+                        for block in iter_part_blocks(stream):
+                            if block not in seen:
+                                seen.add(block)
+                                yield block
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'evaluation_cache.db')
+
+
+class EvaluationCache:
+    """Persistent, content-addressed cache of LLM evaluation results backed by SQLite"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=2000, max_age_seconds=30 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS evaluations ('
+                'key TEXT PRIMARY KEY, result TEXT NOT NULL, '
+                'created_at REAL NOT NULL, last_access REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_evaluations_last_access ON evaluations(last_access)')
+
+    @staticmethod
+    def make_key(prompt, system_prompt, model, temperature, seed, criteria_hash):
+        """Hash every input that determines the completion into a cache key"""
+        payload = json.dumps([prompt, system_prompt, model, temperature, seed, criteria_hash], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached result for key, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result, created_at FROM evaluations WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or (self.max_age_seconds and now - row[1] > self.max_age_seconds):
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute('UPDATE evaluations SET last_access = ? WHERE key = ?', (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, result):
+        """Store a result and evict expired or surplus entries"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO evaluations (key, result, created_at, last_access) VALUES (?, ?, ?, ?)',
+                (key, json.dumps(result, ensure_ascii=False), now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        """Drop entries older than max_age_seconds, then the least recently used beyond max_entries"""
+        if self.max_age_seconds:
+            self._conn.execute('DELETE FROM evaluations WHERE created_at < ?', (now - self.max_age_seconds,))
+        if self.max_entries:
+            self._conn.execute(
+                'DELETE FROM evaluations WHERE key IN ('
+                'SELECT key FROM evaluations ORDER BY last_access DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        """Remove all cached results and reset the counters"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM evaluations')
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters and the current number of cached entries"""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM evaluations').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': entries,
+        }
@@ -0,0 +1,225 @@
+import json
+import re
+import pandas as pd
+
+SEPARATOR_ROW = re.compile(r'^\|?[\s:|-]+\|?$')
+SCORE_PAIR = re.compile(r'"((?:[^"\\]|\\.)+)"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}\s]')
+TABLE_COLUMNS = ['Hallmark', 'Score (0-10)', 'Justification', 'Suggested Indicators']
+JSON_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', '"': '"', '\\': '\\', '/': '/'}
+
+
+def _row_to_cols(row_str, header):
+    cols = [c.strip() for c in row_str.split('|')[1:-1]]
+    cols = [c.replace('\n', '; ') for c in cols]
+    if len(cols) < len(header):
+        cols += [''] * (len(header) - len(cols))
+    elif len(cols) > len(header):
+        cols = cols[:len(header)]
+    return cols
+
+
+def markdown_table_to_dataframe(table_md):
+    """Convert the markdown evaluation table returned by the LLM into a DataFrame"""
+    # Split the table into lines and remove empty lines
+    lines = [line.rstrip() for line in table_md.split('\n') if line.strip()]
+    # Get header
+    header_line = lines[0]
+    header = [h.strip() for h in header_line.split('|')[1:-1]]
+    # Skip the separator line (second line)
+    data_lines = lines[2:]
+    data = []
+    buffer = []
+    # Rows may wrap over several lines; a new row starts with '|'
+    for line in data_lines:
+        if line.startswith('|'):
+            if buffer:
+                cols = _row_to_cols('\n'.join(buffer), header)
+                if any(c for c in cols):
+                    data.append(cols)
+                buffer = []
+        buffer.append(line)
+    if buffer:
+        cols = _row_to_cols('\n'.join(buffer), header)
+        if any(c for c in cols):
+            data.append(cols)
+    df = pd.DataFrame(data, columns=header)
+    return df.dropna(how='all')
+
+
+def _cell(value):
+    return str(value).replace('|', '/').replace('\n', ' ').strip()
+
+
+def structured_to_result(data):
+    """Convert a structured (JSON-schema) evaluation into the result dict used across the app"""
+    hallmarks = [
+        {
+            'title': h['title'],
+            'score': float(h['score']),
+            'justification': h['justification'],
+            'indicators': h['indicators'],
+        }
+        for h in data['hallmarks']
+    ]
+    scores = {h['title']: h['score'] for h in hallmarks}
+    # The markdown table is kept for stored results and callers that still read 'table'
+    table = '\n'.join(
+        ['| ' + ' | '.join(TABLE_COLUMNS) + ' |', '|' + '---|' * len(TABLE_COLUMNS)] +
+        [f"| {_cell(h['title'])} | {h['score']:.1f} | {_cell(h['justification'])} | {_cell(h['indicators'])} |"
+         for h in hallmarks]
+    )
+    overall = round(sum(scores.values()) / len(scores), 1) if scores else data.get('overall_score')
+    return {'hallmarks': hallmarks, 'table': table, 'overall_score': overall, 'scores': scores}
+
+
+def result_to_dataframe(result):
+    """Build the evaluation DataFrame, directly from structured hallmarks when available"""
+    if result.get('hallmarks'):
+        return pd.DataFrame(
+            [[h['title'], h['score'], h['justification'], h['indicators']] for h in result['hallmarks']],
+            columns=TABLE_COLUMNS
+        )
+    return markdown_table_to_dataframe(result['table'])
+
+
+class StreamingEvaluationParser:
+    """Incrementally extract completed table rows and scores from a streamed evaluation JSON object"""
+
+    def __init__(self):
+        self.text = ''
+        self.table_text = ''
+        self.header = None
+        self.scores = {}
+        self._table_pos = None
+        self._table_done = False
+        self._row_lines = []
+        self._line_start = 0
+        self._scores_pos = None
+        self._hallmarks_pos = None
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, delta):
+        """Add a chunk of the response; return newly completed ('header' | 'row' | 'scores', payload) events"""
+        self.text += delta
+        events = []
+        if self._hallmarks_pos is not None or '"hallmarks"' in self.text:
+            return self._advance_hallmarks()
+        if not self._table_done:
+            events.extend(self._advance_table())
+        events.extend(self._advance_scores())
+        return events
+
+    def _advance_hallmarks(self):
+        """Emit each hallmark object of a structured response as soon as it is complete"""
+        if self._hallmarks_pos is None:
+            match = re.search(r'"hallmarks"\s*:\s*\[', self.text)
+            if not match:
+                return []
+            self._hallmarks_pos = match.end()
+        events = []
+        while True:
+            i = self._hallmarks_pos
+            while i < len(self.text) and self.text[i] in ' \t\r\n,':
+                i += 1
+            if i >= len(self.text) or self.text[i] != '{':
+                break
+            try:
+                hallmark, end = self._decoder.raw_decode(self.text, i)
+            except json.JSONDecodeError:
+                break
+            self._hallmarks_pos = end
+            if self.header is None:
+                self.header = list(TABLE_COLUMNS)
+                events.append(('header', self.header))
+            events.append(('row', [hallmark.get('title', ''), hallmark.get('score', ''),
+                                   hallmark.get('justification', ''), hallmark.get('indicators', '')]))
+            try:
+                self.scores[hallmark['title']] = float(hallmark['score'])
+                events.append(('scores', dict(self.scores)))
+            except (KeyError, TypeError, ValueError):
+                pass
+        return events
+
+    def _advance_table(self):
+        if self._table_pos is None:
+            match = re.search(r'"table"\s*:\s*"', self.text)
+            if not match:
+                return []
+            self._table_pos = match.end()
+        # Decode the JSON string value incrementally, stopping before an incomplete escape
+        text = self.text
+        i = self._table_pos
+        out = []
+        while i < len(text):
+            ch = text[i]
+            if ch == '\\':
+                if i + 1 >= len(text):
+                    break
+                if text[i + 1] == 'u':
+                    if i + 6 > len(text):
+                        break
+                    code = int(text[i + 2:i + 6], 16)
+                    if 0xD800 <= code < 0xDC00:
+                        # Surrogate pair: wait for the low half and decode both together
+                        if i + 12 > len(text):
+                            break
+                        out.append(json.loads('"' + text[i:i + 12] + '"'))
+                        i += 12
+                    else:
+                        out.append(chr(code))
+                        i += 6
+                else:
+                    out.append(JSON_ESCAPES.get(text[i + 1], text[i + 1]))
+                    i += 2
+                continue
+            if ch == '"':
+                self._table_done = True
+                i += 1
+                break
+            out.append(ch)
+            i += 1
+        self._table_pos = i
+        self.table_text += ''.join(out)
+        return self._complete_rows()
+
+    def _complete_rows(self):
+        """Group finished lines into rows; a row is complete once the next row starts or the table ends"""
+        events = []
+        lines = self.table_text[self._line_start:].split('\n')
+        finished = lines if self._table_done else lines[:-1]
+        for line in finished:
+            self._line_start += len(line) + 1
+            line = line.rstrip()
+            if not line.strip():
+                continue
+            if line.startswith('|') and self._row_lines:
+                events.extend(self._flush_row())
+            self._row_lines.append(line)
+        if self._table_done and self._row_lines:
+            events.extend(self._flush_row())
+        return events
+
+    def _flush_row(self):
+        row_str = '\n'.join(self._row_lines)
+        self._row_lines = []
+        if SEPARATOR_ROW.match(row_str.strip()):
+            return []
+        if self.header is None:
+            self.header = [h.strip() for h in row_str.split('|')[1:-1]]
+            return [('header', self.header)]
+        cols = _row_to_cols(row_str, self.header)
+        return [('row', cols)] if any(c for c in cols) else []
+
+    def _advance_scores(self):
+        if self._scores_pos is None:
+            match = re.search(r'"scores"\s*:\s*\{', self.text)
+            if not match:
+                return []
+            self._scores_pos = match.end()
+        found = False
+        for match in SCORE_PAIR.finditer(self.text, self._scores_pos):
+            hallmark = json.loads('"' + match.group(1) + '"')
+            if hallmark not in self.scores:
+                self.scores[hallmark] = float(match.group(2))
+                found = True
+        return [('scores', dict(self.scores))] if found else []
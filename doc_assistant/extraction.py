@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from doc_assistant.page_cache import file_hash
+from doc_assistant.pdf_backends import (
+    DEFAULT_PDF_BACKENDS, available_backends, backends_version, iter_page_text, page_count as count_pages
+)
+
+# PDFs shorter than this are extracted by a single worker; splitting them costs more than it saves
+MIN_PAGES_PER_TASK = 8
+# Bump when the page text produced by extract_pdf_pages changes, so cached pages are not reused
+EXTRACTOR_REVISION = 2
+
+
+def pdf_extractor_version(backends):
+    return f"{backends_version(backends)}/{EXTRACTOR_REVISION}"
+
+
+def default_process_count():
+    return min(4, os.cpu_count() or 1)
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """Process-wide pool for PDF page extraction, started on first use and shared by all callers"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            # spawn rather than fork: the app process runs Streamlit's threads
+            _process_pool = ProcessPoolExecutor(
+                max_workers=default_process_count(), mp_context=multiprocessing.get_context('spawn')
+            )
+        return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(cancel_futures=True)
+            _process_pool = None
+
+
+def extract_pdf_pages(file_content, start, stop, backends):
+    """Return the text of pages [start, stop) of a PDF; runs inside worker processes"""
+    return list(iter_page_text(file_content, start, stop, backends))
+
+
+def page_ranges(page_count, workers, min_pages=MIN_PAGES_PER_TASK):
+    """Split range(page_count) into at most `workers` contiguous (start, stop) ranges of at least min_pages"""
+    tasks = max(1, min(workers, page_count // min_pages))
+    size, extra = divmod(page_count, tasks)
+    ranges, start = [], 0
+    for i in range(tasks):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def iter_pdf_pages(file_content, cache=None, max_processes=None, backends=DEFAULT_PDF_BACKENDS):
+    """Yield the text of every page of a PDF in order, from the page cache or extracted in parallel page ranges"""
+    backends = available_backends(backends)
+    extractor = pdf_extractor_version(backends)
+    digest = file_hash(file_content) if cache is not None else None
+    page_count = cache.page_count(digest, extractor) if cache is not None else None
+    cached = cache.get_pages(digest, extractor) if page_count is not None else {}
+    if page_count is None:
+        page_count = count_pages(file_content, backends)
+        if cache is not None:
+            cache.set_document(digest, extractor, page_count)
+    workers = max_processes or default_process_count()
+    ranges = [
+        (start, stop) for start, stop in page_ranges(page_count, workers)
+        if any(p not in cached for p in range(start, stop))
+    ]
+    # Several ranges go to the process pool at once; a single range is streamed page by page in-process
+    futures = {}
+    if workers > 1 and len(ranges) > 1:
+        pool = get_process_pool()
+        futures = {r: pool.submit(extract_pdf_pages, file_content, *r, backends) for r in ranges}
+    try:
+        for start, stop in page_ranges(page_count, workers):
+            if (start, stop) not in ranges:
+                for page in range(start, stop):
+                    yield cached[page]
+                continue
+            if (start, stop) in futures:
+                texts = futures[(start, stop)].result()
+                yield from texts
+            else:
+                texts = []
+                for text in iter_page_text(file_content, start, stop, backends):
+                    texts.append(text)
+                    yield text
+            if cache is not None:
+                cache.set_pages(digest, extractor, list(enumerate(texts, start)))
+    finally:
+        # A consumer that stops early should not leave queued ranges running
+        for future in futures.values():
+            future.cancel()
+
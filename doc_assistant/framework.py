@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import threading
+from types import MappingProxyType
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'input_files')
+COMBINED_FILE = 'combined_hallmarks.json'
+LEVEL_FILE = 'system_change_level_to_hallmarks.json'
+CONDITION_FILE = 'system_change_condition_to_hallmarks.json'
+
+
+def _freeze(obj):
+    """Recursively convert dicts and lists into read-only mappings and tuples"""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+
+def json_default(obj):
+    """json.dumps hook so frozen framework views serialise like the original JSON"""
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class HallmarkFramework:
+    """Immutable, pre-indexed view of the hallmark framework and its level/condition mappings"""
+
+    def __init__(self, criteria, level_map, condition_map, criteria_hash, version):
+        self.criteria = _freeze(criteria)
+        self.level_map = _freeze(level_map)
+        self.condition_map = _freeze(condition_map)
+        self.criteria_hash = criteria_hash
+        self.version = version
+        self.titles = tuple(h.get('Hallmark Title', key) for key, h in criteria.items())
+        self.title_to_id = MappingProxyType({
+            h.get('Hallmark Title', key): key for key, h in criteria.items()
+        })
+        self.hallmark_to_level = MappingProxyType({
+            h: level for level, hallmarks in level_map.items() for h in hallmarks
+        })
+        self.hallmark_to_condition = MappingProxyType({
+            h: cond for cond, hallmarks in condition_map.items() for h in hallmarks
+        })
+        self._validate()
+
+    def _validate(self):
+        """Every mapped hallmark must exist in the framework and every hallmark must be mapped"""
+        known = set(self.titles)
+        for name, mapping in (('level', self.hallmark_to_level), ('condition', self.hallmark_to_condition)):
+            unknown = sorted(set(mapping) - known)
+            if unknown:
+                raise ValueError(f"System change {name} mapping refers to unknown hallmarks: {', '.join(unknown)}")
+            unmapped = [t for t in self.titles if t not in mapping]
+            if unmapped:
+                raise ValueError(f"Hallmarks missing from the system change {name} mapping: {', '.join(unmapped)}")
+
+
+class FrameworkRegistry:
+    """Loads the framework files once and reloads them only when a file's mtime changes"""
+
+    def __init__(self, input_dir=INPUT_DIR):
+        self.paths = tuple(os.path.join(input_dir, f) for f in (COMBINED_FILE, LEVEL_FILE, CONDITION_FILE))
+        self._lock = threading.Lock()
+        self._mtimes = None
+        self._framework = None
+
+    def get(self):
+        """Return the current framework, reloading it if any input file changed"""
+        for path in self.paths:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"{os.path.basename(path)} not found in input_files directory")
+        mtimes = tuple(os.stat(p).st_mtime_ns for p in self.paths)
+        with self._lock:
+            if mtimes != self._mtimes:
+                self._framework = self._load()
+                self._mtimes = mtimes
+            return self._framework
+
+    def _load(self):
+        raw = []
+        for path in self.paths:
+            with open(path, 'rb') as f:
+                raw.append(f.read())
+        criteria, level_map, condition_map = (json.loads(data.decode('utf-8')) for data in raw)
+        return HallmarkFramework(
+            criteria, level_map, condition_map,
+            criteria_hash=hashlib.sha256(raw[0]).hexdigest(),
+            version=hashlib.sha256(b'\0'.join(raw)).hexdigest(),
+        )
+
+
+_registry = FrameworkRegistry()
+
+
+def get_framework():
+    """Return the process-wide hallmark framework"""
+    return _registry.get()
@@ -1,61 +1,24 @@
-﻿from openai import OpenAI, AzureOpenAI
+﻿import openai
+from openai import OpenAI, AzureOpenAI, AsyncAzureOpenAI
 import streamlit as st
-import plotly.graph_objects as go
+import asyncio
+import random
+import threading
+import time
+import importlib.util
+import httpx
 import json
 import re
 import csv
 import io
 import os
 from dotenv import load_dotenv
+from doc_assistant.evaluation_cache import EvaluationCache
+from doc_assistant.evaluation_table import StreamingEvaluationParser, structured_to_result
+from doc_assistant.framework import get_framework
+from doc_assistant.tokenizer import count_tokens
 
-class LLMService:
-    def __init__(self):
-        # Load environment variables from .env file
-        load_dotenv()
-        
-        # Try to get OpenAI API key from st.secrets first, then fallback to .env
-        api_key = None
-        
-        # First try st.secrets (for Streamlit Cloud deployment)
-        try:
-            if 'AZURE_OPENAI_API_KEY' in st.secrets:
-                api_key = st.secrets['AZURE_OPENAI_API_KEY']
-            if 'ENDPOINT_URL' in st.secrets:
-                endpoint = st.secrets['ENDPOINT_URL']
-        except Exception:
-            # st.secrets might not be available in all contexts
-            pass
-        
-        # If not found in st.secrets, try .env file
-        if not api_key or not endpoint:
-            endpoint = os.getenv("ENDPOINT_URL")
-            api_key = os.getenv("AZURE_OPENAI_API_KEY")
-        
-        # If still not found, raise an error
-        if not api_key or not endpoint:
-            raise ValueError(
-                'Azure OpenAI API or Endpoint URL not found. Please add it to either:' + chr(10) +
-                '1. Streamlit secrets (for deployment): Add to your secrets.toml file' + chr(10) +
-                '2. Environment file: Add AZURE_OPENAI_API_KEY and ENDPOINT_URL to your .env file'
-            )
-
-        # Initialize Azure OpenAI client with key-based authentication
-        self.client = AzureOpenAI(
-            azure_endpoint=endpoint,
-            api_key=api_key,
-            api_version="2025-01-01-preview",
-        )
-
-        
-    def get_evaluation(self, prompt):
-        """Get evaluation results, return raw JSON data"""
-        try:
-            chat_prompt = [
-                {
-                    "role": "system", "content": [
-                        {
-                            "type": "text",
-                            "text": '''You are a professional systemic investing evaluation expert. Your task is to assess investment cases based on the 13 hallmarks framework.
+EVALUATION_SYSTEM_PROMPT = '''You are a professional systemic investing evaluation expert. Your task is to assess investment cases based on the 13 hallmarks framework.
 
     IMPORTANT: You MUST return your response in the following JSON format:
     {
@@ -77,64 +40,428 @@ class LLMService:
     The overall_score should be a number with one decimal point.
     The scores object should use the full Hallmark title as the key, matching the Hallmark column in the table, and contain all 13 hallmark scores as numbers.
 
-    Ensure your evaluation is thorough, objective, and well-justified.'''}
-                    ]
-                },
-                {
-                    "role": "user", "content": [
-                        {
-                            "type": "text",
-                            "text": prompt
+    Ensure your evaluation is thorough, objective, and well-justified.'''
+
+def load_azure_credentials():
+    """Return (endpoint, api_key) from Streamlit secrets or the .env file"""
+    # Load environment variables from .env file
+    load_dotenv()
+    
+    # Try to get OpenAI API key from st.secrets first, then fallback to .env
+    api_key = None
+    endpoint = None
+    
+    # First try st.secrets (for Streamlit Cloud deployment)
+    try:
+        if 'AZURE_OPENAI_API_KEY' in st.secrets:
+            api_key = st.secrets['AZURE_OPENAI_API_KEY']
+        if 'ENDPOINT_URL' in st.secrets:
+            endpoint = st.secrets['ENDPOINT_URL']
+    except Exception:
+        # st.secrets might not be available in all contexts
+        pass
+    
+    # If not found in st.secrets, try .env file
+    if not api_key or not endpoint:
+        endpoint = os.getenv("ENDPOINT_URL")
+        api_key = os.getenv("AZURE_OPENAI_API_KEY")
+    
+    # If still not found, raise an error
+    if not api_key or not endpoint:
+        raise ValueError(
+            'Azure OpenAI API or Endpoint URL not found. Please add it to either:' + chr(10) +
+            '1. Streamlit secrets (for deployment): Add to your secrets.toml file' + chr(10) +
+            '2. Environment file: Add AZURE_OPENAI_API_KEY and ENDPOINT_URL to your .env file'
+        )
+    return endpoint, api_key
+
+STRUCTURED_SYSTEM_PROMPT = '''You are a professional systemic investing evaluation expert. Your task is to assess investment cases based on the 13 hallmarks framework.
+
+For each hallmark, in the order of the provided framework, you should:
+1. Use the full Hallmark Title as the title
+2. Provide a score from 0 to 10 (with one decimal point)
+3. Give a brief justification for the rating
+4. Suggest relevant indicators from the provided indicator set
+
+The overall_score should be the average score with one decimal point.
+
+Ensure your evaluation is thorough, objective, and well-justified.'''
+
+
+def build_evaluation_schema(hallmark_titles=None):
+    """JSON schema for structured evaluations; titles are restricted to the framework when given"""
+    title = {"type": "string"}
+    if hallmark_titles:
+        title["enum"] = list(hallmark_titles)
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "hallmark_evaluation",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "hallmarks": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "title": title,
+                                "score": {"type": "number"},
+                                "justification": {"type": "string"},
+                                "indicators": {"type": "string"}
+                            },
+                            "required": ["title", "score", "justification", "indicators"],
+                            "additionalProperties": False
                         }
-                    ]
-                }
-            ]
+                    },
+                    "overall_score": {"type": "number"}
+                },
+                "required": ["hallmarks", "overall_score"],
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously to `per_minute` units per minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount, now):
+        """Take amount now, letting the balance go negative, and return the seconds to wait until it is covered"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+
+class RequestGovernor:
+    """Shared rate-limit governor: RPM/TPM token buckets, Retry-After handling and jittered exponential backoff"""
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, max_retries=6, base_delay=1.0, max_delay=60.0):
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens):
+        """Reserve one request and `tokens` tokens, returning how long the caller must wait"""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self.blocked_until - now)
+            if self.request_bucket is not None:
+                wait = max(wait, self.request_bucket.reserve(1, now))
+            if self.token_bucket is not None:
+                wait = max(wait, self.token_bucket.reserve(tokens, now))
+            return wait
+
+    def _retry_delay(self, error, attempt):
+        """Delay before the next attempt: the server's Retry-After if given, else capped exponential backoff with full jitter"""
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        retry_after = None
+        try:
+            if headers.get('retry-after-ms'):
+                retry_after = float(headers['retry-after-ms']) / 1000.0
+            elif headers.get('retry-after'):
+                retry_after = float(headers['retry-after'])
+        except ValueError:
+            retry_after = None
+        if retry_after is not None:
+            # Pause every caller, not just this one, until the server accepts requests again
+            with self._lock:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            return retry_after + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, fn, tokens=0):
+        """Call fn() once capacity is available, retrying rate limits and transient errors"""
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._reserve(tokens))
+            try:
+                return fn()
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(e, attempt))
+
+    async def acall(self, fn, tokens=0):
+        """Await fn() once capacity is available, retrying rate limits and transient errors"""
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._reserve(tokens))
+            try:
+                return await fn()
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._retry_delay(e, attempt))
+
+
+_default_governor = None
+_default_governor_lock = threading.Lock()
+
+
+def get_default_governor():
+    """Process-wide governor, configured from AZURE_OPENAI_RPM / AZURE_OPENAI_TPM when set"""
+    global _default_governor
+    with _default_governor_lock:
+        if _default_governor is None:
+            load_dotenv()
+            rpm = os.getenv("AZURE_OPENAI_RPM")
+            tpm = os.getenv("AZURE_OPENAI_TPM")
+            _default_governor = RequestGovernor(
+                requests_per_minute=int(rpm) if rpm else None,
+                tokens_per_minute=int(tpm) if tpm else None,
+            )
+        return _default_governor
+
+class LLMService:
+    model = "gpt-4o-mini"
+    temperature = 0
+    seed = 42
+    api_version = "2025-01-01-preview"
+    # Azure counts the requested completion against the tokens/minute quota as well
+    expected_completion_tokens = 2000
+
+    def __init__(self, cache=None, response_mode='structured', governor=None):
+        if response_mode not in ('structured', 'legacy'):
+            raise ValueError(f"Unsupported response mode: {response_mode}")
+        endpoint, api_key = load_azure_credentials()
+
+        # Initialize Azure OpenAI client with key-based authentication
+        self.client = self._create_client(endpoint, api_key)
+
+        # Content-addressed result cache, keyed on the prompt, model settings and criteria file
+        self.cache = cache if cache is not None else EvaluationCache()
+
+        # 'structured' asks for schema-conforming JSON with one object per hallmark;
+        # 'legacy' asks for a markdown table in prose JSON and repairs it when needed
+        self.response_mode = response_mode
+        self._framework = None
+        self._response_format = None
+
+        # Retries are handled by the shared governor instead of the SDK
+        self.governor = governor if governor is not None else get_default_governor()
+        self._system_prompt_tokens = count_tokens(self._system_prompt(), self.model)
+
+    def _create_client(self, endpoint, api_key):
+        return AzureOpenAI(
+            azure_endpoint=endpoint,
+            api_key=api_key,
+            api_version=self.api_version,
+            max_retries=0,
+        )
 
-            # Include speech result if speech is enabled
-            messages = chat_prompt
+    @property
+    def criteria_hash(self):
+        return get_framework().criteria_hash
+
+    @property
+    def response_format(self):
+        """Structured-output schema for the current framework, or None in legacy mode"""
+        if self.response_mode != 'structured':
+            return None
+        framework = get_framework()
+        if framework is not self._framework:
+            self._response_format = build_evaluation_schema(framework.titles)
+            self._framework = framework
+        return self._response_format
+
+    def _request_tokens(self, prompt, prompt_tokens=None, system_prompt=None):
+        """Tokens a request counts against the quota, reusing a pre-computed prompt token count when given"""
+        if prompt_tokens is None:
+            prompt_tokens = count_tokens(prompt, self.model)
+        system_tokens = self._system_prompt_tokens if system_prompt is None else count_tokens(system_prompt, self.model)
+        return system_tokens + prompt_tokens + self.expected_completion_tokens
+
+    def _cache_key(self, prompt, use_cache):
+        """Return the result cache key for prompt, or None when caching is disabled"""
+        if not use_cache or self.cache is None:
+            return None
+        system_prompt = self._system_prompt()
+        if self.response_format is not None:
+            system_prompt += json.dumps(self.response_format, sort_keys=True)
+        return self.cache.make_key(
+            prompt, system_prompt, self.model, self.temperature, self.seed, self.criteria_hash
+        )
+
+    def _system_prompt(self):
+        return STRUCTURED_SYSTEM_PROMPT if self.response_mode == 'structured' else EVALUATION_SYSTEM_PROMPT
+
+    def _completion_kwargs(self):
+        kwargs = dict(model=self.model, stop=None, temperature=self.temperature, seed=self.seed)
+        if self.response_format is not None:
+            kwargs['response_format'] = self.response_format
+        return kwargs
+
+    def _build_messages(self, prompt, system_prompt=None):
+        return [
+            {
+                "role": "system", "content": [
+                    {
+                        "type": "text",
+                        "text": system_prompt or self._system_prompt()}
+                ]
+            },
+            {
+                "role": "user", "content": [
+                    {
+                        "type": "text",
+                        "text": prompt
+                    }
+                ]
+            }
+        ]
+
+    def cached_evaluation(self, prompt):
+        """Return the cached result for prompt without calling the model, or None"""
+        cache_key = self._cache_key(prompt, True)
+        return self.cache.get(cache_key) if cache_key is not None else None
+
+    def get_evaluation(self, prompt, use_cache=True, prompt_tokens=None):
+        """Get evaluation results, return raw JSON data"""
+        try:
+            cache_key = self._cache_key(prompt, use_cache)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
 
             # Generate the completion
-            completion = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
-                stop=None,
-                stream=False,
-                temperature=0,
-                seed=42
+            completion = self.governor.call(
+                lambda: self.client.chat.completions.create(
+                    messages=self._build_messages(prompt),
+                    stream=False,
+                    **self._completion_kwargs()
+                ),
+                tokens=self._request_tokens(prompt, prompt_tokens)
             )
 
-            # Parse JSON response
-            response_text = completion.choices[0].message.content
-            try:
-                # Try to parse JSON directly
-                result = json.loads(response_text)
-            except json.JSONDecodeError:
-                # If direct parsing fails, try to extract and clean JSON part
-                try:
-                    # Find JSON start and end positions
-                    start = response_text.find('{')
-                    end = response_text.rfind('}') + 1
-                    if start != -1 and end != -1:
-                        json_str = response_text[start:end]
-                        # Clean JSON string
-                        cleaned_json = self.clean_json_string(json_str)
-                        result = json.loads(cleaned_json)
-                    else:
-                        raise json.JSONDecodeError("No JSON object found", response_text, 0)
-                except Exception as e:
-                    raise ValueError(f"Failed to parse the response as JSON: {str(e)}")
-            # Ensure scores is dict type
-            if 'scores' in result and isinstance(result['scores'], str):
-                try:
-                    result['scores'] = json.loads(result['scores'])
-                except Exception:
-                    raise ValueError("The scores field returned by LLM is a string and cannot be parsed as a dictionary.")
-            if 'scores' in result and not isinstance(result['scores'], dict):
-                raise ValueError("The scores field returned by LLM is not a dictionary.")
+            result = self._parse_response(completion.choices[0].message.content)
+            if cache_key is not None:
+                self.cache.set(cache_key, result)
             return result
                 
         except Exception as e:
-            raise Exception(f"Error getting LLM response: {str(e)}")
+            raise Exception(f"Error getting LLM response: {str(e)}") from e
+
+    def get_structured_completion(self, prompt, system_prompt, response_format, use_cache=True, prompt_tokens=None):
+        """Run a completion with its own system prompt and JSON schema, return the parsed JSON object"""
+        try:
+            cache_key = None
+            if use_cache and self.cache is not None:
+                cache_key = self.cache.make_key(
+                    prompt, system_prompt + json.dumps(response_format, sort_keys=True),
+                    self.model, self.temperature, self.seed, self.criteria_hash
+                )
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+            completion = self.governor.call(
+                lambda: self.client.chat.completions.create(
+                    messages=self._build_messages(prompt, system_prompt),
+                    stream=False,
+                    model=self.model, stop=None, temperature=self.temperature, seed=self.seed,
+                    response_format=response_format
+                ),
+                tokens=self._request_tokens(prompt, prompt_tokens, system_prompt)
+            )
+
+            result = json.loads(completion.choices[0].message.content)
+            if cache_key is not None:
+                self.cache.set(cache_key, result)
+            return result
+
+        except Exception as e:
+            raise Exception(f"Error getting LLM response: {str(e)}") from e
+
+    def stream_evaluation(self, prompt, use_cache=True, prompt_tokens=None):
+        """Stream an evaluation, yielding header/row/scores events as they arrive and finally ('result', result)"""
+        try:
+            parser = StreamingEvaluationParser()
+            cache_key = self._cache_key(prompt, use_cache)
+            cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                # Replay the cached result through the parser so callers see the same events
+                yield from parser.feed(json.dumps(cached, ensure_ascii=False))
+                yield ('result', cached)
+                return
+
+            # Only opening the stream is retried; a failure mid-stream would duplicate events
+            stream = self.governor.call(
+                lambda: self.client.chat.completions.create(
+                    messages=self._build_messages(prompt),
+                    stream=True,
+                    **self._completion_kwargs()
+                ),
+                tokens=self._request_tokens(prompt, prompt_tokens)
+            )
+            for chunk in stream:
+                # Azure sends content-filter chunks without choices
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                yield from parser.feed(chunk.choices[0].delta.content)
+
+            result = self._parse_response(parser.text)
+            if cache_key is not None:
+                self.cache.set(cache_key, result)
+            yield ('result', result)
+
+        except Exception as e:
+            raise Exception(f"Error getting LLM response: {str(e)}") from e
+
+    def _parse_response(self, response_text):
+        """Parse the JSON evaluation returned by the model"""
+        if self.response_mode == 'structured':
+            # The schema guarantees valid JSON, so no brace scanning or repair is needed
+            try:
+                return structured_to_result(json.loads(response_text))
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                raise ValueError(f"Failed to parse the structured response: {str(e)}")
+        try:
+            # Try to parse JSON directly
+            result = json.loads(response_text)
+        except json.JSONDecodeError:
+            # If direct parsing fails, try to extract and clean JSON part
+            try:
+                # Find JSON start and end positions
+                start = response_text.find('{')
+                end = response_text.rfind('}') + 1
+                if start != -1 and end != -1:
+                    json_str = response_text[start:end]
+                    # Clean JSON string
+                    cleaned_json = self.clean_json_string(json_str)
+                    result = json.loads(cleaned_json)
+                else:
+                    raise json.JSONDecodeError("No JSON object found", response_text, 0)
+            except Exception as e:
+                raise ValueError(f"Failed to parse the response as JSON: {str(e)}")
+        # Ensure scores is dict type
+        if 'scores' in result and isinstance(result['scores'], str):
+            try:
+                result['scores'] = json.loads(result['scores'])
+            except Exception:
+                raise ValueError("The scores field returned by LLM is a string and cannot be parsed as a dictionary.")
+        if 'scores' in result and not isinstance(result['scores'], dict):
+            raise ValueError("The scores field returned by LLM is not a dictionary.")
+        return result
 
     def clean_json_string(self, json_str):
         """Clean JSON string"""
@@ -144,168 +471,95 @@ class LLMService:
         json_str = json_str.replace('\n', '\\n')
         return json_str
 
-class EvaluationVisualizer:
-    def __init__(self):
-        # Load mapping files
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        level_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'input_files', 'system_change_level_to_hallmarks.json')
-        condition_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'input_files', 'system_change_condition_to_hallmarks.json')
-        with open(level_path, 'r', encoding='utf-8') as f:
-            self.level_map = json.load(f)
-        with open(condition_path, 'r', encoding='utf-8') as f:
-            self.condition_map = json.load(f)
-
-    def create_radar_chart(self, scores: dict, height=1000, width=1000) -> go.Figure:
-        # Create radar chart directly using scores dictionary
-        categories = list(scores.keys())
-        values = list(scores.values())
-        fig = go.Figure()
-        fig.add_trace(go.Scatterpolar(
-            r=values,
-            theta=categories,
-            fill='toself',
-            name='Hallmark Scores'
-        ))
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(visible=True, range=[0, 10]),
-                angularaxis=dict(tickangle=0, tickfont=dict(size=12))
-            ),
-            showlegend=False,
-            title=dict(text="Hallmark Scores Radar Chart", y=0.95, x=0.5, xanchor='center', yanchor='top'),
-            height=height,
-            width=width,
-            margin=dict(l=150, r=150, t=100, b=100)
-        )
-        return fig
-
-    def create_level_radar_chart(self, scores: dict, height=800, width=800) -> go.Figure:
-        categories = []
-        values = []
-        for level, hallmarks in self.level_map.items():
-            hallmark_scores = [scores.get(h, None) for h in hallmarks if h in scores]
-            hallmark_scores = [s for s in hallmark_scores if s is not None]
-            avg = round(sum(hallmark_scores)/len(hallmark_scores), 2) if hallmark_scores else 0
-            categories.append(level)
-            values.append(avg)
-        fig = go.Figure()
-        fig.add_trace(go.Scatterpolar(
-            r=values,
-            theta=categories,
-            fill='toself',
-            name='System Change Level Scores'
-        ))
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(visible=True, range=[0, 10]),
-                angularaxis=dict(tickangle=0, tickfont=dict(size=12))
-            ),
-            showlegend=False,
-            title=dict(text="System Change Level Radar Chart", y=0.95, x=0.5, xanchor='center', yanchor='top'),
-            height=height,
-            width=width,
-            margin=dict(l=160, r=160, t=80, b=80)
-        )
-        return fig
-
-    def create_condition_radar_chart(self, scores: dict, height=800, width=800) -> go.Figure:
-        categories = []
-        values = []
-        for cond, hallmarks in self.condition_map.items():
-            hallmark_scores = [scores.get(h, None) for h in hallmarks if h in scores]
-            hallmark_scores = [s for s in hallmark_scores if s is not None]
-            avg = round(sum(hallmark_scores)/len(hallmark_scores), 2) if hallmark_scores else 0
-            categories.append(cond)
-            values.append(avg)
-        fig = go.Figure()
-        fig.add_trace(go.Scatterpolar(
-            r=values,
-            theta=categories,
-            fill='toself',
-            name='System Change Condition Scores'
-        ))
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(visible=True, range=[0, 10]),
-                angularaxis=dict(tickangle=0, tickfont=dict(size=12))
+class AsyncLLMService(LLMService):
+    """Asynchronous evaluation client sharing one pooled, keep-alive HTTP connection set"""
+
+    def __init__(self, cache=None, response_mode='structured', governor=None,
+                 max_concurrency=8, max_connections=20, timeout=120.0):
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.timeout = timeout
+        super().__init__(cache=cache, response_mode=response_mode, governor=governor)
+
+    def _create_client(self, endpoint, api_key):
+        # One httpx.AsyncClient per service so every request reuses the same pool;
+        # HTTP/2 multiplexes concurrent requests over a single connection when h2 is installed
+        self.http_client = httpx.AsyncClient(
+            http2=importlib.util.find_spec('h2') is not None,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=60.0,
             ),
-            showlegend=False,
-            title=dict(text="System Change Condition Radar Chart", y=0.95, x=0.5, xanchor='center', yanchor='top'),
-            height=height,
-            width=width,
-            margin=dict(l=100, r=100, t=80, b=80)
+            timeout=self.timeout,
         )
-        return fig
-
-    def create_merged_level_condition_radar(self, scores: dict) -> go.Figure:
-        # Calculate average score for level and condition
-        level_categories = list(self.level_map.keys())
-        level_values = []
-        for level, hallmarks in self.level_map.items():
-            hallmark_scores = [scores.get(h, None) for h in hallmarks if h in scores]
-            hallmark_scores = [s for s in hallmark_scores if s is not None]
-            avg = round(sum(hallmark_scores)/len(hallmark_scores), 2) if hallmark_scores else 0
-            level_values.append(avg)
-        condition_categories = list(self.condition_map.keys())
-        condition_values = []
-        for cond, hallmarks in self.condition_map.items():
-            hallmark_scores = [scores.get(h, None) for h in hallmarks if h in scores]
-            hallmark_scores = [s for s in hallmark_scores if s is not None]
-            avg = round(sum(hallmark_scores)/len(hallmark_scores), 2) if hallmark_scores else 0
-            condition_values.append(avg)
-        # Merge all dimensions
-        all_categories = level_categories + condition_categories
-        level_plot = level_values + [None]*len(condition_categories)
-        condition_plot = [None]*len(level_categories) + condition_values
-        fig = go.Figure()
-        fig.add_trace(go.Scatterpolar(
-            r=level_plot,
-            theta=all_categories,
-            fill='toself',
-            name='System Change Levels',
-            line=dict(color='blue')
-        ))
-        fig.add_trace(go.Scatterpolar(
-            r=condition_plot,
-            theta=all_categories,
-            fill='toself',
-            name='System Change Conditions',
-            line=dict(color='orange')
-        ))
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(visible=True, range=[0, 10]),
-                angularaxis=dict(tickangle=0, tickfont=dict(size=12))
-            ),
-            showlegend=True,
-            title=dict(text="System Change Levels & Conditions Radar Chart", y=0.95, x=0.5, xanchor='center', yanchor='top'),
-            height=900,
-            width=900,
-            margin=dict(l=160, r=160, t=80, b=80)
+        return AsyncAzureOpenAI(
+            azure_endpoint=endpoint,
+            api_key=api_key,
+            api_version=self.api_version,
+            http_client=self.http_client,
+            max_retries=0,
         )
-        return fig
-
-    def display_evaluation(self, result):
-        """Display evaluation results"""
-        # Display table
-        st.markdown(result['table'])
-        
-        # Display overall score
-        st.subheader("Overall Score")
-        st.write(f"Average Score: {result['overall_score']}")
-        
-        # Create and display radar chart
-        st.subheader("Score Distribution")
+
+    def get_evaluation(self, prompt, use_cache=True, prompt_tokens=None):
+        raise TypeError("AsyncLLMService is asynchronous; use aget_evaluation or agather_evaluations")
+
+    def get_structured_completion(self, prompt, system_prompt, response_format, use_cache=True, prompt_tokens=None):
+        raise TypeError("AsyncLLMService is asynchronous; use LLMService for structured completions")
+
+    def stream_evaluation(self, prompt, use_cache=True, prompt_tokens=None):
+        raise TypeError("AsyncLLMService is asynchronous; use LLMService for streamed evaluations")
+
+    async def aget_evaluation(self, prompt, use_cache=True, prompt_tokens=None):
+        """Get evaluation results asynchronously, return raw JSON data"""
         try:
-            fig = self.create_radar_chart(result['scores'])
-            st.plotly_chart(fig)
+            cache_key = self._cache_key(prompt, use_cache)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+            completion = await self.governor.acall(
+                lambda: self.client.chat.completions.create(
+                    messages=self._build_messages(prompt),
+                    stream=False,
+                    **self._completion_kwargs()
+                ),
+                tokens=self._request_tokens(prompt, prompt_tokens)
+            )
+
+            result = self._parse_response(completion.choices[0].message.content)
+            if cache_key is not None:
+                self.cache.set(cache_key, result)
+            return result
+
         except Exception as e:
-            st.error(f"Error creating radar chart: {str(e)}")
+            raise Exception(f"Error getting LLM response: {str(e)}") from e
+
+    async def agather_evaluations(self, prompts, use_cache=True, return_exceptions=False):
+        """Evaluate prompts concurrently with at most max_concurrency in flight, results in input order"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(prompt):
+            async with semaphore:
+                return await self.aget_evaluation(prompt, use_cache=use_cache)
+
+        return await asyncio.gather(*(bounded(p) for p in prompts), return_exceptions=return_exceptions)
+
+    async def aclose(self):
+        await self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
 
-        fig1 = self.create_level_radar_chart(result['scores'])
-        fig2 = self.create_condition_radar_chart(result['scores'])
-        st.plotly_chart(fig1)
-        st.plotly_chart(fig2)
 
-        fig3 = self.create_merged_level_condition_radar(result['scores'])
-        st.plotly_chart(fig3) 
+def __getattr__(name):
+    # EvaluationVisualizer lives in doc_assistant.visualizer so that importing the LLM
+    # service does not pull in plotly; keep the old import path working lazily
+    if name == 'EvaluationVisualizer':
+        from doc_assistant.visualizer import EvaluationVisualizer
+        return EvaluationVisualizer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PAGE_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'page_text.db')
+
+
+def file_hash(file_content):
+    return hashlib.sha256(file_content).hexdigest()
+
+
+class PageTextCache:
+    """Persistent cache of extracted page text keyed on (file hash, page number, extractor version)"""
+
+    def __init__(self, path=DEFAULT_PAGE_CACHE_PATH, max_documents=500):
+        self.path = path
+        self.max_documents = max_documents
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS documents ('
+                'file_hash TEXT NOT NULL, extractor TEXT NOT NULL, page_count INTEGER NOT NULL, '
+                'last_access REAL NOT NULL, PRIMARY KEY (file_hash, extractor))'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS pages ('
+                'file_hash TEXT NOT NULL, extractor TEXT NOT NULL, page INTEGER NOT NULL, text TEXT NOT NULL, '
+                'PRIMARY KEY (file_hash, extractor, page))'
+            )
+
+    def page_count(self, digest, extractor):
+        """Return the recorded page count of a document, or None if it has not been seen"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT page_count FROM documents WHERE file_hash = ? AND extractor = ?', (digest, extractor)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    'UPDATE documents SET last_access = ? WHERE file_hash = ? AND extractor = ?',
+                    (time.time(), digest, extractor)
+                )
+        return row[0] if row else None
+
+    def get_pages(self, digest, extractor):
+        """Return {page number: text} for every cached page of a document"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT page, text FROM pages WHERE file_hash = ? AND extractor = ?', (digest, extractor)
+            ).fetchall()
+        return dict(rows)
+
+    def set_document(self, digest, extractor, page_count):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO documents (file_hash, extractor, page_count, last_access) VALUES (?, ?, ?, ?)',
+                (digest, extractor, page_count, time.time())
+            )
+            self._evict()
+
+    def set_pages(self, digest, extractor, pages):
+        """Store [(page number, text)] for a document"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO pages (file_hash, extractor, page, text) VALUES (?, ?, ?, ?)',
+                [(digest, extractor, page, text) for page, text in pages]
+            )
+
+    def _evict(self):
+        """Drop the least recently used documents beyond max_documents; caller holds the lock"""
+        if not self.max_documents:
+            return
+        stale = self._conn.execute(
+            'SELECT file_hash, extractor FROM documents ORDER BY last_access DESC LIMIT -1 OFFSET ?',
+            (self.max_documents,)
+        ).fetchall()
+        for digest, extractor in stale:
+            self._conn.execute('DELETE FROM pages WHERE file_hash = ? AND extractor = ?', (digest, extractor))
+            self._conn.execute('DELETE FROM documents WHERE file_hash = ? AND extractor = ?', (digest, extractor))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM pages')
+            self._conn.execute('DELETE FROM documents')
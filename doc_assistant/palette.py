@@ -0,0 +1,55 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import plotly.colors
+
+# ColorBrewer scale per system change level, as used by the score comparison table
+GROUP_COLORSCALES = {
+    "Transformational Change (implicit)": "YlOrBr",
+    "Relational Change(semi-explicit)": "PuBu",
+    "Structural Change(explicit)": "BuGn",
+}
+DEFAULT_COLORSCALE = "Greys"
+
+
+@lru_cache(maxsize=None)
+def build_palette(scale_name, stops=256):
+    """Return `stops` hex colours linearly interpolated across a plotly sequential ColorBrewer scale"""
+    rgb = np.array(
+        [plotly.colors.unlabel_rgb(c) for c in plotly.colors.convert_colors_to_same_type(
+            getattr(plotly.colors.sequential, scale_name))[0]],
+        dtype=float
+    )
+    anchors = np.linspace(0.0, 1.0, len(rgb))
+    positions = np.linspace(0.0, 1.0, stops)
+    channels = np.column_stack([np.interp(positions, anchors, rgb[:, i]) for i in range(3)])
+    channels = np.rint(channels).astype(int)
+    return np.array([f'#{r:02x}{g:02x}{b:02x}' for r, g, b in channels])
+
+
+@lru_cache(maxsize=None)
+def css_palette(scale_name, stops=256):
+    """Background-color declarations for every palette stop, plus a trailing empty style for missing scores"""
+    return np.array([f'background-color: {c};' for c in build_palette(scale_name, stops)] + [''], dtype=object)
+
+
+def color_values(values, scale_name, vmin, vmax):
+    """Map an array of scores to background-color CSS with one palette lookup; NaN maps to no style"""
+    css = css_palette(scale_name)
+    stops = len(css) - 1
+    values = np.asarray(values, dtype=float)
+    scaled = np.clip((values - vmin) / (vmax - vmin), 0.0, 1.0)
+    index = np.full(values.shape, stops)
+    present = ~np.isnan(scaled)
+    index[present] = np.rint(scaled[present] * (stops - 1)).astype(int)
+    return css[index]
+
+
+def score_styles(df, hallmark_to_group, vmin=0, vmax=20):
+    """Return a DataFrame of cell CSS for df (cases x hallmarks), colouring each column by its hallmark's group"""
+    styles = {}
+    for col in df.columns:
+        scale = GROUP_COLORSCALES.get(hallmark_to_group.get(col), DEFAULT_COLORSCALE)
+        styles[col] = color_values(df[col].to_numpy(dtype=float, na_value=np.nan), scale, vmin, vmax)
+    return pd.DataFrame(styles, index=df.index, columns=df.columns)
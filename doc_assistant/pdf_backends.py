@@ -0,0 +1,195 @@
+"""PDF text extraction backends.
+
+Usage:
+    python -m doc_assistant.pdf_backends FILE.pdf [FILE.pdf ...] [--backends pdfium pdfplumber]
+
+Backends are tried in order for every page: the first available one extracts the page and
+the next is consulted only when the text is empty or looks like garbage (unmapped glyphs,
+replacement characters). Run as a module to compare the throughput of each backend in pages/second.
+"""
+import argparse
+import io
+import sys
+import threading
+import time
+from importlib.metadata import PackageNotFoundError, version
+from importlib.util import find_spec
+
+# Fraction of undecodable characters above which a page's text is treated as garbage
+GARBAGE_RATIO = 0.1
+
+
+class PdfplumberDocument:
+    """Layout-aware extraction; accurate but slow"""
+
+    def __init__(self, file_content):
+        import pdfplumber
+        self._pdf = pdfplumber.open(io.BytesIO(file_content))
+        self.page_count = len(self._pdf.pages)
+
+    def page_text(self, index):
+        page = self._pdf.pages[index]
+        text = page.extract_text() or ''
+        # Release the parsed page objects as soon as their text is taken
+        page.flush_cache()
+        return text
+
+    def close(self):
+        self._pdf.close()
+
+
+# pdfium is not thread-safe, so in-process use is serialised across threads
+_pdfium_lock = threading.RLock()
+
+
+class PdfiumDocument:
+    """Raw text layer through pypdfium2; many times faster than pdfplumber on text-only reports"""
+
+    def __init__(self, file_content):
+        import pypdfium2
+        with _pdfium_lock:
+            self._pdf = pypdfium2.PdfDocument(file_content)
+            self.page_count = len(self._pdf)
+
+    def page_text(self, index):
+        with _pdfium_lock:
+            page = self._pdf[index]
+            textpage = page.get_textpage()
+            try:
+                text = textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+        return text.replace('\r\n', '\n').strip()
+
+    def close(self):
+        with _pdfium_lock:
+            self._pdf.close()
+
+
+# name -> (document class, distribution providing it)
+PDF_BACKENDS = {
+    'pdfium': (PdfiumDocument, 'pypdfium2'),
+    'pdfplumber': (PdfplumberDocument, 'pdfplumber'),
+}
+DEFAULT_PDF_BACKENDS = ('pdfium', 'pdfplumber')
+
+
+def register_pdf_backend(name, document_class, package):
+    """Add a backend; document_class(file_content) needs page_count, page_text(index) and close().
+
+    Register at import time of a module the worker processes also import, since PDF pages are
+    extracted in spawned processes.
+    """
+    PDF_BACKENDS[name] = (document_class, package)
+
+
+def available_backends(names=DEFAULT_PDF_BACKENDS):
+    """Return the registered backends among names whose package is installed, in order"""
+    backends = tuple(n for n in names if n in PDF_BACKENDS and find_spec(PDF_BACKENDS[n][1]) is not None)
+    if not backends:
+        raise ValueError(f"No PDF extraction backend available among: {', '.join(names)}")
+    return backends
+
+
+def backends_version(backends):
+    """Identify a backend chain and its package versions, e.g. 'pdfium-<version>+pdfplumber-<version>'"""
+    parts = []
+    for name in backends:
+        try:
+            parts.append(f"{name}-{version(PDF_BACKENDS[name][1])}")
+        except PackageNotFoundError:
+            parts.append(name)
+    return '+'.join(parts)
+
+
+def looks_like_garbage(text):
+    """True when most of the text did not decode: unmapped (cid:N) glyphs, replacement or private-use characters"""
+    if not text:
+        return False
+    bad = text.count('(cid:') * 8
+    for ch in text:
+        code = ord(ch)
+        if ch == '\ufffd' or 0xE000 <= code <= 0xF8FF or (code < 32 and ch not in '\n\r\t'):
+            bad += 1
+    return bad / len(text) > GARBAGE_RATIO
+
+
+def needs_fallback(text):
+    """True when a backend's page text is empty, whitespace only or garbage, so the next backend should try"""
+    return not text.strip() or looks_like_garbage(text)
+
+
+def open_document(name, file_content):
+    return PDF_BACKENDS[name][0](file_content)
+
+
+def page_count(file_content, backends):
+    document = open_document(backends[0], file_content)
+    try:
+        return document.page_count
+    finally:
+        document.close()
+
+
+def iter_page_text(file_content, start, stop, backends):
+    """Yield the text of pages [start, stop), falling back along the backend chain for empty or garbage pages"""
+    primary = open_document(backends[0], file_content)
+    fallbacks = {}
+    try:
+        for index in range(start, stop):
+            text = primary.page_text(index)
+            for name in backends[1:]:
+                if not needs_fallback(text):
+                    break
+                if name not in fallbacks:
+                    fallbacks[name] = open_document(name, file_content)
+                fallback_text = fallbacks[name].page_text(index)
+                # A fallback that finds nothing either keeps the earlier text
+                if fallback_text.strip():
+                    text = fallback_text
+            yield text
+    finally:
+        primary.close()
+        for document in fallbacks.values():
+            document.close()
+
+
+def benchmark(file_contents, backend_chains):
+    """Extract every page of every file with each backend chain; returns [{backend, pages, seconds, pages_per_second}]"""
+    report = []
+    for backends in backend_chains:
+        pages = 0
+        started = time.perf_counter()
+        for content in file_contents:
+            count = page_count(content, backends)
+            pages += sum(1 for _ in iter_page_text(content, 0, count, backends))
+        seconds = time.perf_counter() - started
+        report.append({
+            'backend': ' -> '.join(backends),
+            'pages': pages,
+            'seconds': round(seconds, 3),
+            'pages_per_second': round(pages / seconds, 1) if seconds else 0.0,
+        })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare PDF text extraction throughput per backend")
+    parser.add_argument('files', nargs='+', help="PDF files to extract")
+    parser.add_argument('--backends', nargs='+', default=list(DEFAULT_PDF_BACKENDS), help="backends to compare")
+    args = parser.parse_args(argv)
+    backends = available_backends(args.backends)
+    contents = []
+    for path in args.files:
+        with open(path, 'rb') as f:
+            contents.append(f.read())
+    # Each backend on its own, then the fallback chain used by the app
+    chains = [(name,) for name in backends] + ([backends] if len(backends) > 1 else [])
+    for row in benchmark(contents, chains):
+        print(f"{row['backend']:<28} {row['pages']:>6} pages {row['seconds']:>9.3f}s {row['pages_per_second']:>9.1f} pages/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from doc_assistant.tokenizer import DEFAULT_MODEL, get_encoder, make_chunker
+
+# Separator appended after each uploaded file, as on the Evaluate page
+FILE_SEPARATOR = '\n\n'
+
+
+class Prefetch:
+    """Runs a generator in a background thread, buffering up to maxsize items ahead of the consumer"""
+
+    def __init__(self, iterable, maxsize=64):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(iterable,), daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        # Give up once the consumer has gone away instead of blocking on a full queue forever
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, iterable):
+        try:
+            for item in iterable:
+                if not self._put((False, item)):
+                    return
+        except BaseException as e:
+            self._put((True, e))
+        else:
+            self._put((True, None))
+
+    def __iter__(self):
+        try:
+            while True:
+                done, item = self._queue.get()
+                if done:
+                    if item is not None:
+                        raise item
+                    return
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        self._closed.set()
+
+
+def iter_file_segments(processor, file_type, file_content):
+    """Yield one file's text in pieces as it is extracted; the pieces join to process_user_document's result"""
+    if file_type == 'pdf':
+        pieces = (text for text in processor.iter_pdf_pages(file_content) if text)
+    elif file_type == 'docx':
+        pieces = processor.iter_docx_blocks(file_content)
+    else:
+        yield processor.process_user_document(file_content, file_type)
+        return
+    try:
+        for i, piece in enumerate(pieces):
+            yield piece if i == 0 else '\n' + piece
+    except Exception as e:
+        raise ValueError(f"Error processing {file_type} file: {str(e)}") from e
+
+
+def iter_segments(processor, files, separator=FILE_SEPARATOR, read_ahead=4):
+    """Yield the text of [(file_type, file_content)] in upload order, each file followed by separator.
+
+    Up to read_ahead files are extracted concurrently in background threads while earlier ones are consumed.
+    """
+    files = iter(files)
+    pending = deque()
+
+    def start_next():
+        item = next(files, None)
+        if item is not None:
+            pending.append(Prefetch(iter_file_segments(processor, *item)))
+
+    for _ in range(read_ahead):
+        start_next()
+    try:
+        while pending:
+            current = pending[0]
+            yield from current
+            pending.popleft()
+            start_next()
+            yield separator
+    finally:
+        for prefetch in pending:
+            prefetch.close()
+
+
+def read_prefix(segments, max_tokens, model_name=DEFAULT_MODEL):
+    """Read a segment stream until its text exceeds max_tokens, counting tokens as TokenizedDocument.total_tokens does.
+
+    Returns (text, tokens, rest). rest is None when the whole stream fitted; otherwise it is the iterator
+    of unread segments, so a long document can be chunked on from where reading stopped.
+    """
+    encoder = get_encoder(model_name)
+    segments = iter(segments)
+    parts, tokens, partial = [], 0, ''
+    for segment in segments:
+        parts.append(segment)
+        lines = (partial + segment).split('\n')
+        partial = lines.pop()
+        if lines:
+            # Each complete line counts its tokens plus one for its line break
+            tokens += sum(len(t) for t in encoder.encode_ordinary_batch(lines)) + len(lines)
+        if tokens > max_tokens:
+            return ''.join(parts), tokens, segments
+    tokens += len(encoder.encode_ordinary(partial))
+    return ''.join(parts), tokens, (iter(()) if tokens > max_tokens else None)
+
+
+def iter_chunks(segments, max_tokens=2000, model_name=DEFAULT_MODEL, content_defined=False):
+    """Yield token-bounded chunks from a stream of text segments; same blocks as TokenizedDocument.split"""
+    encoder = get_encoder(model_name)
+    chunker = make_chunker(encoder, max_tokens, content_defined)
+    partial = ''
+    for segment in segments:
+        lines = (partial + segment).split('\n')
+        # The last line may continue in the next segment
+        partial = lines.pop()
+        if lines:
+            for line, tokens in zip(lines, encoder.encode_ordinary_batch(lines)):
+                yield from chunker.add(line, tokens)
+    yield from chunker.add(partial, encoder.encode_ordinary(partial))
+    yield from chunker.finish()
+
+
+def _cached_future(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def evaluate_chunks(chunks, processor, llm_service, max_workers=4, stats=None):
+    """Yield (chunk, result) in chunk order, sending each chunk to the LLM as soon as it is produced.
+
+    Chunks already evaluated under the same framework are answered from the result cache without
+    taking a worker; stats, if given, counts them as {'chunks': n, 'reused': n}.
+    """
+    if stats is not None:
+        stats.update(chunks=0, reused=0)
+
+    def lookup(chunk):
+        prompt = processor.prepare_prompt(chunk)
+        cached = llm_service.cached_evaluation(prompt)
+        if stats is not None:
+            stats['chunks'] += 1
+            stats['reused'] += cached is not None
+        return prompt, cached
+
+    # max_workers=1 keeps the original strictly sequential behaviour
+    if max_workers <= 1:
+        for chunk in chunks:
+            prompt, cached = lookup(chunk)
+            yield chunk, cached if cached is not None else llm_service.get_evaluation(prompt)
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            prompt, cached = lookup(chunk)
+            future = _cached_future(cached) if cached is not None else executor.submit(llm_service.get_evaluation, prompt)
+            in_flight.append((chunk, future))
+            # Hand back finished results in order, and stop producing chunks while the pool is saturated
+            while in_flight and (in_flight[0][1].done() or len(in_flight) >= 2 * max_workers):
+                done_chunk, future = in_flight.popleft()
+                yield done_chunk, future.result()
+        while in_flight:
+            done_chunk, future = in_flight.popleft()
+            yield done_chunk, future.result()
+
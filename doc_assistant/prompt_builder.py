@@ -0,0 +1,77 @@
+import json
+from doc_assistant.framework import json_default
+from doc_assistant.tokenizer import get_encoder
+
+FRAMEWORK_FORMATS = ('indented', 'minified', 'condensed')
+
+
+def render_framework(criteria, framework_format='minified'):
+    """Render the hallmark framework as indented JSON, minified JSON or condensed text"""
+    if framework_format == 'indented':
+        return json.dumps(criteria, ensure_ascii=False, indent=2, default=json_default)
+    if framework_format == 'minified':
+        return json.dumps(criteria, ensure_ascii=False, separators=(',', ':'), default=json_default)
+    if framework_format == 'condensed':
+        sections = []
+        for hallmark_id, hallmark in criteria.items():
+            lines = [
+                f"## {hallmark_id}: {hallmark.get('Hallmark Title', '')}",
+                f"Level: {hallmark.get('System Change Level', '')} | Condition: {hallmark.get('System Change Condition', '')}",
+                f"Definition: {hallmark.get('Definition', '')}",
+                f"Implications for Investment Practice: {hallmark.get('Implications for Investment Practice', '')}",
+                "Indicators:",
+            ]
+            for ind in hallmark.get('Indicators', []):
+                lines.append(
+                    f"- {ind.get('Theme/Objective', '')}: {ind.get('Synthesized Indicator', '')} "
+                    f"({ind.get('Indicator Type', '')}; cases: {ind.get('Supported Case Number', '')})"
+                )
+            sections.append('\n'.join(lines))
+        return '\n\n'.join(sections)
+    raise ValueError(f"Unsupported framework format: {framework_format}")
+
+
+class PromptBuilder:
+    """Build evaluation prompts around a framework rendering that is computed once"""
+
+    def __init__(self, criteria, framework_format='minified', model_name='gpt-4o-mini'):
+        self.framework_format = framework_format
+        self.model_name = model_name
+        self.framework_text = render_framework(criteria, framework_format)
+        # Everything before the case document is identical for every prompt, so it forms
+        # a stable prefix that Azure OpenAI prompt caching can reuse across chunks and cases
+        self.prefix = (
+            "Please evaluate the following case using the provided framework:\n\n"
+            "Evaluation Framework (Hallmarks):\n"
+            f"{self.framework_text}\n\n"
+            "Case Document:\n"
+        )
+        self._framework_tokens = None
+
+    def build(self, user_doc):
+        """Prepare prompt to send to LLM"""
+        return self.prefix + user_doc
+
+    @property
+    def framework_tokens(self):
+        """Token count of the shared prompt prefix, computed on first use"""
+        if self._framework_tokens is None:
+            enc = get_encoder(self.model_name)
+            self._framework_tokens = len(enc.encode_ordinary(self.prefix))
+        return self._framework_tokens
+
+    def token_report(self, documents, document_tokens=None):
+        """Report framework vs document tokens for one document or a list of chunks sent as separate prompts"""
+        if isinstance(documents, str):
+            documents = [documents]
+        if document_tokens is None:
+            enc = get_encoder(self.model_name)
+            document_tokens = sum(len(enc.encode_ordinary(d)) for d in documents)
+        framework_tokens = self.framework_tokens * len(documents)
+        total = framework_tokens + document_tokens
+        return {
+            'prompts': len(documents),
+            'framework_tokens': framework_tokens,
+            'document_tokens': document_tokens,
+            'framework_ratio': round(framework_tokens / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,53 @@
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+# First-load cost (import + construction) of each shared service, in seconds
+_startup_timings = {}
+
+
+@contextmanager
+def timed(name):
+    """Record how long the first execution of the block named `name` takes"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _startup_timings.setdefault(name, time.perf_counter() - started)
+
+
+def startup_report():
+    """Return [(service, seconds)] for every service constructed in this process"""
+    return [(name, round(seconds, 3)) for name, seconds in _startup_timings.items()]
+
+
+# Services are process-wide singletons shared by all sessions; each is safe for concurrent use
+
+@st.cache_resource(show_spinner=False)
+def get_document_processor():
+    with timed('DocumentProcessor'):
+        from doc_assistant.document_processor import DocumentProcessor
+        return DocumentProcessor()
+
+
+@st.cache_resource(show_spinner=False)
+def get_llm_service():
+    with timed('LLMService'):
+        from doc_assistant.llm_service import LLMService
+        return LLMService()
+
+
+@st.cache_resource(show_spinner=False)
+def get_visualizer():
+    with timed('EvaluationVisualizer'):
+        from doc_assistant.visualizer import EvaluationVisualizer
+        return EvaluationVisualizer()
+
+
+@st.cache_resource(show_spinner=False)
+def get_case_store():
+    with timed('CaseStore'):
+        from doc_assistant.case_store import CaseStore
+        return CaseStore()
+
@@ -0,0 +1,166 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+
+from doc_assistant.tokenizer import DEFAULT_MODEL, count_tokens, get_encoder
+
+SUMMARY_SYSTEM_PROMPT = '''You summarise evaluation notes for a systemic investing assessment.
+
+For each hallmark given, merge its notes from the different sections of one case document into:
+1. justification: a concise summary of the evaluation reasons
+2. indicators: a concise, de-duplicated list of the suggested indicators
+
+Use only the notes provided and keep the full Hallmark Title as the title.'''
+
+
+def build_summary_schema(hallmark_titles):
+    """JSON schema for summarising the notes of the given hallmarks, one object per hallmark"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "hallmark_summaries",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "summaries": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "title": {"type": "string", "enum": list(hallmark_titles)},
+                                "justification": {"type": "string"},
+                                "indicators": {"type": "string"}
+                            },
+                            "required": ["title", "justification", "indicators"],
+                            "additionalProperties": False
+                        }
+                    }
+                },
+                "required": ["summaries"],
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+class HallmarkSummarizer:
+    """Reduce stage of long-document evaluation: merges every hallmark's per-chunk notes with batched structured calls.
+
+    Notes are reduced as a tree: each level merges up to fan_in notes of a hallmark per group, all groups of a
+    level run in parallel, and levels repeat until every hallmark is down to one summary. Every call stays within
+    max_input_tokens, and the depth grows with the logarithm of the chunk count.
+    """
+
+    def __init__(self, llm_service, max_input_tokens=12000, fan_in=4, max_workers=4, model_name=DEFAULT_MODEL):
+        self.llm_service = llm_service
+        self.max_input_tokens = max_input_tokens
+        self.fan_in = max(2, fan_in)
+        self.max_workers = max_workers
+        self.model_name = model_name
+        # Token budget of one group of notes; a note is clipped to half of it so any two notes can be merged
+        self.group_tokens = max_input_tokens // 2
+        self.levels = 0
+
+    @staticmethod
+    def _section(hallmark, justifications, indicators):
+        lines = [f"## {hallmark}", "Evaluation reasons:"]
+        lines += [f"- {j}" for j in justifications if j]
+        lines.append("Suggested indicators:")
+        lines += [f"- {i}" for i in indicators if i]
+        return '\n'.join(lines)
+
+    def _clip(self, text, max_tokens):
+        encoder = get_encoder(self.model_name)
+        tokens = encoder.encode_ordinary(text)
+        return text if len(tokens) <= max_tokens else encoder.decode(tokens[:max_tokens])
+
+    def _clip_note(self, note):
+        limit = self.group_tokens // 4
+        return self._clip(note[0], limit), self._clip(note[1], limit)
+
+    def group_notes(self, notes):
+        """Split one hallmark's [(justification, indicators)] notes into groups of at most fan_in notes and group_tokens"""
+        groups, current, used = [], [], 0
+        for note in notes:
+            tokens = count_tokens(f"- {note[0]}\n- {note[1]}", self.model_name)
+            if current and (len(current) >= self.fan_in or used + tokens > self.group_tokens):
+                groups.append(current)
+                current, used = [], 0
+            current.append(note)
+            used += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    def batches(self, sections):
+        """Pack [(key, hallmark, section)] first-fit into calls of at most max_input_tokens, each hallmark once per call"""
+        batches = []
+        for key, hallmark, section in sections:
+            tokens = count_tokens(section, self.model_name)
+            for batch in batches:
+                if hallmark not in batch['hallmarks'] and batch['tokens'] + tokens <= self.max_input_tokens:
+                    break
+            else:
+                batch = {'items': [], 'tokens': 0, 'hallmarks': set()}
+                batches.append(batch)
+            batch['items'].append((key, hallmark, section))
+            batch['tokens'] += tokens
+            batch['hallmarks'].add(hallmark)
+        return [batch['items'] for batch in batches]
+
+    def _summarize_batch(self, batch):
+        titles = [hallmark for _, hallmark, _ in batch]
+        prompt = "Summarise the notes of each hallmark below.\n\n" + '\n\n'.join(section for _, _, section in batch)
+        data = self.llm_service.get_structured_completion(
+            prompt, SUMMARY_SYSTEM_PROMPT, build_summary_schema(titles),
+            prompt_tokens=count_tokens(prompt, self.model_name)
+        )
+        by_title = {item['title']: item for item in data.get('summaries', [])}
+        return {
+            key: (by_title[hallmark]['justification'], by_title[hallmark]['indicators'])
+            for key, hallmark, _ in batch if hallmark in by_title
+        }
+
+    def _run_level(self, sections):
+        """Summarise every section of one tree level, batches in parallel; returns {key: (justification, indicators)}"""
+        batches = self.batches(sections)
+        merged = {}
+        if self.max_workers <= 1 or len(batches) <= 1:
+            for batch in batches:
+                merged.update(self._summarize_batch(batch))
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                for result in executor.map(self._summarize_batch, batches):
+                    merged.update(result)
+        return merged
+
+    def summarize(self, justifications, indicators):
+        """Summarise {hallmark: [per-chunk notes]} into ({hallmark: justification}, {hallmark: indicators})"""
+        hallmarks = list(dict.fromkeys([*justifications, *indicators]))
+        notes = {
+            h: list(zip_longest(justifications.get(h, []), indicators.get(h, []), fillvalue='')) for h in hallmarks
+        }
+        final = {}
+        pending = hallmarks
+        self.levels = 0
+        while pending:
+            groups = {h: self.group_notes([self._clip_note(n) for n in notes[h]]) for h in pending}
+            merged = self._run_level([
+                ((h, i), h, self._section(h, [n[0] for n in group], [n[1] for n in group]))
+                for h in pending for i, group in enumerate(groups[h])
+            ])
+            self.levels += 1
+            next_pending = []
+            for h in pending:
+                # A group the model left out keeps its concatenated notes rather than disappearing
+                reduced = [
+                    merged.get((h, i)) or (' '.join(n[0] for n in group), ' '.join(n[1] for n in group))
+                    for i, group in enumerate(groups[h])
+                ]
+                if len(reduced) == 1:
+                    final[h] = reduced[0]
+                else:
+                    notes[h] = reduced
+                    next_pending.append(h)
+            pending = next_pending
+        return {h: final[h][0] for h in hallmarks}, {h: final[h][1] for h in hallmarks}
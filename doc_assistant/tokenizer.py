@@ -0,0 +1,135 @@
+import hashlib
+from collections import deque
+from functools import lru_cache
+from itertools import accumulate
+
+import tiktoken
+
+DEFAULT_MODEL = 'gpt-4o-mini'
+
+
+@lru_cache(maxsize=None)
+def get_encoder(model_name=DEFAULT_MODEL):
+    """Load the tiktoken encoder for model_name once per process"""
+    return tiktoken.encoding_for_model(model_name)
+
+
+def count_tokens(text, model_name=DEFAULT_MODEL):
+    """Count tokens in text, treating special-token markers as ordinary text"""
+    return len(get_encoder(model_name).encode_ordinary(text))
+
+
+def split_tokens(encoder, tokens, max_tokens):
+    """Split one over-long line's tokens into text pieces of at most max_tokens without breaking UTF-8 characters"""
+    pieces = []
+    carry = b''
+    for i in range(0, len(tokens), max_tokens):
+        data = carry + encoder.decode_bytes(tokens[i:i + max_tokens])
+        try:
+            pieces.append(data.decode('utf-8'))
+            carry = b''
+        except UnicodeDecodeError as e:
+            # A multi-byte character straddles the token boundary; finish it in the next piece
+            pieces.append(data[:e.start].decode('utf-8', errors='replace'))
+            carry = data[e.start:]
+    if carry:
+        pieces[-1] += carry.decode('utf-8', errors='replace')
+    return pieces
+
+
+class LineChunker:
+    """Packs encoded lines, fed one at a time, into blocks of whole lines of at most max_tokens"""
+
+    def __init__(self, encoder, max_tokens=2000):
+        self.encoder = encoder
+        self.max_tokens = max_tokens
+        self.current = []
+        self.token_count = 0
+
+    def _flush(self):
+        block = '\n'.join(self.current)
+        self.current = []
+        self.token_count = 0
+        return block
+
+    def add(self, line, tokens):
+        """Add one line with its tokens; returns the blocks completed by it"""
+        blocks = []
+        line_tokens = len(tokens)
+        if line_tokens > self.max_tokens:
+            if self.current:
+                blocks.append(self._flush())
+            blocks.extend(split_tokens(self.encoder, tokens, self.max_tokens))
+            return blocks
+        if self.token_count + line_tokens > self.max_tokens and self.current:
+            blocks.append(self._flush())
+        self.current.append(line)
+        self.token_count += line_tokens
+        return blocks
+
+    def finish(self):
+        """Return the last, partially filled block, if any"""
+        return [self._flush()] if self.current else []
+
+
+class ContentDefinedChunker(LineChunker):
+    """Packs lines into blocks whose boundaries are chosen by the content of the lines around them.
+
+    Once a block holds min_tokens, it ends after a line when a hash of the last `window` lines falls
+    below a threshold proportional to that line's tokens, i.e. about once every target_tokens tokens
+    whatever the line lengths; a block that reaches max_tokens first is cut there.
+    Boundaries depend only on nearby text: an edit moves the boundaries next to it and the blocks
+    further away come out identical, which lets their cached evaluations be reused.
+    With the defaults (min_tokens = max_tokens/2, target_tokens = 3/4 of max_tokens) blocks span
+    max_tokens/2 to max_tokens and most are cut at the cap, so the mean is near 90% of max_tokens:
+    above target_tokens, and only slightly more blocks, and LLM calls, than LineChunker.
+    """
+
+    def __init__(self, encoder, max_tokens=2000, target_tokens=None, min_tokens=None, window=3):
+        super().__init__(encoder, max_tokens)
+        self.target_tokens = target_tokens or max(1, 3 * max_tokens // 4)
+        self.min_tokens = max_tokens // 2 if min_tokens is None else min_tokens
+        self.recent = deque(maxlen=window)
+
+    def _is_boundary(self, line_tokens):
+        digest = hashlib.blake2b('\n'.join(self.recent).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') < (line_tokens << 64) // self.target_tokens
+
+    def add(self, line, tokens):
+        self.recent.append(line)
+        blocks = super().add(line, tokens)
+        if self.current and self.token_count >= self.min_tokens and self._is_boundary(len(tokens)):
+            blocks.append(self._flush())
+        return blocks
+
+
+def make_chunker(encoder, max_tokens=2000, content_defined=False):
+    return ContentDefinedChunker(encoder, max_tokens) if content_defined else LineChunker(encoder, max_tokens)
+
+
+class TokenizedDocument:
+    """A document encoded once, line by line, with cumulative token offsets per line"""
+
+    def __init__(self, text, model_name=DEFAULT_MODEL):
+        self.text = text
+        self.model_name = model_name
+        self.encoder = get_encoder(model_name)
+        self.lines = text.split('\n')
+        self.line_tokens = self.encoder.encode_ordinary_batch(self.lines)
+        # offsets[i] is the number of tokens in lines[:i]
+        self.offsets = [0] + list(accumulate(len(t) for t in self.line_tokens))
+
+    @property
+    def total_tokens(self):
+        """Token count of the whole document: line tokens plus one per line break"""
+        return self.offsets[-1] + len(self.lines) - 1
+
+    def split(self, max_tokens=2000, content_defined=False):
+        """Split into blocks of whole lines of at most max_tokens, splitting lines longer than that;
+        content_defined picks boundaries that stay put when other parts of the document are edited"""
+        chunker = make_chunker(self.encoder, max_tokens, content_defined)
+        blocks = []
+        for line, tokens in zip(self.lines, self.line_tokens):
+            blocks.extend(chunker.add(line, tokens))
+        blocks.extend(chunker.finish())
+        return blocks
@@ -0,0 +1,325 @@
+import threading
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from collections import OrderedDict
+from functools import lru_cache
+from doc_assistant.aggregation import get_aggregator
+from doc_assistant.framework import get_framework
+
+
+@lru_cache(maxsize=256)
+def _group_scores(aggregator, score_items):
+    levels, conditions = aggregator.level_condition_means(dict(score_items))
+    return tuple(levels), tuple(conditions)
+
+
+class FigureCache:
+    """Thread-safe LRU of built figures keyed on (chart kind, scores, size)"""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            figure = self._entries.get(key)
+            if figure is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return figure
+            self.misses += 1
+        figure = build()
+        with self._lock:
+            self._entries[key] = figure
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return figure
+
+
+COMPARISON_VIEWS = {
+    'hallmark': 'Hallmarks',
+    'level': 'System Change Levels',
+    'condition': 'System Change Conditions',
+}
+
+# Above this many selected cases the overlay is drawn as percentile bands instead of one trace per case
+OVERLAY_CASE_LIMIT = 40
+
+
+def _closed(values):
+    """Repeat the first point so a polar line closes the loop"""
+    values = list(values)
+    return values + values[:1]
+
+
+class EvaluationVisualizer:
+    def __init__(self, figure_cache_size=128):
+        self.figure_cache = FigureCache(maxsize=figure_cache_size)
+
+    @property
+    def level_map(self):
+        return get_framework().level_map
+
+    @property
+    def condition_map(self):
+        return get_framework().condition_map
+
+    def group_scores(self, scores: dict):
+        """Return (level averages, condition averages) for scores, computed once and shared by all charts"""
+        return _group_scores(get_aggregator(), tuple(scores.items()))
+
+    def _memoised(self, kind, scores, height, width):
+        """Return the figure for a chart, building it only on a miss"""
+        key = (kind, tuple(scores.items()), height, width, get_framework().version)
+        return self.figure_cache.get_or_build(
+            key, lambda: getattr(self, f'_build_{kind}')(scores, height=height, width=width)
+        )
+
+    # Figures are memoised and shared between callers; copy one before mutating it
+
+    def create_radar_chart(self, scores: dict, height=1000, width=1000) -> go.Figure:
+        return self._memoised('radar_chart', scores, height, width)
+
+    def create_level_radar_chart(self, scores: dict, height=800, width=800) -> go.Figure:
+        return self._memoised('level_radar_chart', scores, height, width)
+
+    def create_condition_radar_chart(self, scores: dict, height=800, width=800) -> go.Figure:
+        return self._memoised('condition_radar_chart', scores, height, width)
+
+    def create_merged_level_condition_radar(self, scores: dict, height=900, width=900) -> go.Figure:
+        return self._memoised('merged_level_condition_radar', scores, height, width)
+
+    def _build_radar_chart(self, scores: dict, height=1000, width=1000) -> go.Figure:
+        # Create radar chart directly using scores dictionary
+        categories = list(scores.keys())
+        values = list(scores.values())
+        fig = go.Figure()
+        fig.add_trace(go.Scatterpolar(
+            r=values,
+            theta=categories,
+            fill='toself',
+            name='Hallmark Scores'
+        ))
+        fig.update_layout(
+            polar=dict(
+                radialaxis=dict(visible=True, range=[0, 10]),
+                angularaxis=dict(tickangle=0, tickfont=dict(size=12))
+            ),
+            showlegend=False,
+            title=dict(text="Hallmark Scores Radar Chart", y=0.95, x=0.5, xanchor='center', yanchor='top'),
+            height=height,
+            width=width,
+            margin=dict(l=150, r=150, t=100, b=100)
+        )
+        return fig
+
+    def _build_level_radar_chart(self, scores: dict, height=800, width=800) -> go.Figure:
+        categories = list(self.level_map.keys())
+        values = list(self.group_scores(scores)[0])
+        fig = go.Figure()
+        fig.add_trace(go.Scatterpolar(
+            r=values,
+            theta=categories,
+            fill='toself',
+            name='System Change Level Scores'
+        ))
+        fig.update_layout(
+            polar=dict(
+                radialaxis=dict(visible=True, range=[0, 10]),
+                angularaxis=dict(tickangle=0, tickfont=dict(size=12))
+            ),
+            showlegend=False,
+            title=dict(text="System Change Level Radar Chart", y=0.95, x=0.5, xanchor='center', yanchor='top'),
+            height=height,
+            width=width,
+            margin=dict(l=160, r=160, t=80, b=80)
+        )
+        return fig
+
+    def _build_condition_radar_chart(self, scores: dict, height=800, width=800) -> go.Figure:
+        categories = list(self.condition_map.keys())
+        values = list(self.group_scores(scores)[1])
+        fig = go.Figure()
+        fig.add_trace(go.Scatterpolar(
+            r=values,
+            theta=categories,
+            fill='toself',
+            name='System Change Condition Scores'
+        ))
+        fig.update_layout(
+            polar=dict(
+                radialaxis=dict(visible=True, range=[0, 10]),
+                angularaxis=dict(tickangle=0, tickfont=dict(size=12))
+            ),
+            showlegend=False,
+            title=dict(text="System Change Condition Radar Chart", y=0.95, x=0.5, xanchor='center', yanchor='top'),
+            height=height,
+            width=width,
+            margin=dict(l=100, r=100, t=80, b=80)
+        )
+        return fig
+
+    def _build_merged_level_condition_radar(self, scores: dict, height=900, width=900) -> go.Figure:
+        # Calculate average score for level and condition
+        level_categories = list(self.level_map.keys())
+        condition_categories = list(self.condition_map.keys())
+        level_values, condition_values = (list(v) for v in self.group_scores(scores))
+        # Merge all dimensions
+        all_categories = level_categories + condition_categories
+        level_plot = level_values + [None]*len(condition_categories)
+        condition_plot = [None]*len(level_categories) + condition_values
+        fig = go.Figure()
+        fig.add_trace(go.Scatterpolar(
+            r=level_plot,
+            theta=all_categories,
+            fill='toself',
+            name='System Change Levels',
+            line=dict(color='blue')
+        ))
+        fig.add_trace(go.Scatterpolar(
+            r=condition_plot,
+            theta=all_categories,
+            fill='toself',
+            name='System Change Conditions',
+            line=dict(color='orange')
+        ))
+        fig.update_layout(
+            polar=dict(
+                radialaxis=dict(visible=True, range=[0, 10]),
+                angularaxis=dict(tickangle=0, tickfont=dict(size=12))
+            ),
+            showlegend=True,
+            title=dict(text="System Change Levels & Conditions Radar Chart", y=0.95, x=0.5, xanchor='center', yanchor='top'),
+            height=height,
+            width=width,
+            margin=dict(l=160, r=160, t=80, b=80)
+        )
+        return fig
+
+    def create_comparison_radar(self, cases: dict, view='hallmark', overlay_limit=OVERLAY_CASE_LIMIT,
+                                height=800, width=900) -> go.Figure:
+        """Radar comparison of {case name: scores}; one WebGL trace per case up to overlay_limit, percentile bands beyond"""
+        key = ('comparison', view, overlay_limit, height, width, get_framework().version,
+               tuple((name, tuple(scores.items())) for name, scores in cases.items()))
+        return self.figure_cache.get_or_build(
+            key, lambda: self._build_comparison_radar(cases, view, overlay_limit, height, width)
+        )
+
+    def _build_comparison_radar(self, cases, view, overlay_limit, height, width):
+        aggregator = get_aggregator()
+        labels, values = aggregator.view_matrix(list(cases.values()), view)
+        theta = _closed(labels)
+        fig = go.Figure()
+        if len(cases) <= overlay_limit:
+            for name, row in zip(cases, values):
+                fig.add_trace(go.Scatterpolargl(
+                    r=_closed(np.where(np.isnan(row), None, row).tolist()),
+                    theta=theta,
+                    mode='lines+markers',
+                    name=name,
+                    marker=dict(size=4),
+                    line=dict(width=1.5)
+                ))
+            title = f"{COMPARISON_VIEWS[view]}: {len(cases)} Cases"
+        else:
+            bands = aggregator.percentile_bands(values)
+            # Each band is its inner ring followed by its outer ring filled back to it
+            for low, high, color in ((10, 90, 'rgba(31, 119, 180, 0.15)'), (25, 75, 'rgba(31, 119, 180, 0.35)')):
+                fig.add_trace(go.Scatterpolar(
+                    r=_closed(bands[low]), theta=theta, mode='lines',
+                    line=dict(width=0), hoverinfo='skip', showlegend=False
+                ))
+                fig.add_trace(go.Scatterpolar(
+                    r=_closed(bands[high]), theta=theta, mode='lines', fill='tonext',
+                    fillcolor=color, line=dict(width=0), name=f"p{low}–p{high}"
+                ))
+            fig.add_trace(go.Scatterpolar(
+                r=_closed(bands[50]), theta=theta, mode='lines+markers',
+                line=dict(color='rgb(31, 119, 180)', width=2), name='Median'
+            ))
+            title = f"{COMPARISON_VIEWS[view]}: Score Distribution Across {len(cases)} Cases"
+        fig.update_layout(
+            polar=dict(
+                radialaxis=dict(visible=True, range=[0, 10]),
+                angularaxis=dict(tickangle=0, tickfont=dict(size=11))
+            ),
+            showlegend=True,
+            title=dict(text=title, y=0.95, x=0.5, xanchor='center', yanchor='top'),
+            height=height,
+            width=width,
+            margin=dict(l=120, r=120, t=80, b=80)
+        )
+        return fig
+
+    def create_small_multiples(self, cases: dict, view='level', columns=4, panel_size=260) -> go.Figure:
+        """Grid of small radar charts, one per case; callers page large selections so the grid stays small"""
+        key = ('small_multiples', view, columns, panel_size, get_framework().version,
+               tuple((name, tuple(scores.items())) for name, scores in cases.items()))
+        return self.figure_cache.get_or_build(
+            key, lambda: self._build_small_multiples(cases, view, columns, panel_size)
+        )
+
+    def _build_small_multiples(self, cases, view, columns, panel_size):
+        from plotly.subplots import make_subplots
+
+        labels, values = get_aggregator().view_matrix(list(cases.values()), view)
+        names = list(cases)
+        rows = max(1, -(-len(names) // columns))
+        fig = make_subplots(
+            rows=rows, cols=columns,
+            specs=[[{'type': 'polar'}] * columns for _ in range(rows)],
+            subplot_titles=names,
+            horizontal_spacing=0.06,
+            vertical_spacing=0.3 / rows
+        )
+        theta = _closed(labels)
+        for i, row in enumerate(values):
+            fig.add_trace(go.Scatterpolar(
+                r=_closed(np.where(np.isnan(row), None, row).tolist()),
+                theta=theta,
+                fill='toself',
+                name=names[i],
+                line=dict(width=1)
+            ), row=i // columns + 1, col=i % columns + 1)
+        # Same radial range everywhere, and no angular labels so panels stay readable at small sizes
+        fig.update_polars(
+            radialaxis=dict(range=[0, 10], showticklabels=False),
+            angularaxis=dict(showticklabels=False)
+        )
+        fig.update_annotations(font_size=11)
+        fig.update_layout(
+            showlegend=False,
+            height=rows * panel_size,
+            margin=dict(l=20, r=20, t=40, b=20)
+        )
+        return fig
+
+    def display_evaluation(self, result):
+        """Display evaluation results"""
+        # Display table
+        st.markdown(result['table'])
+        
+        # Display overall score
+        st.subheader("Overall Score")
+        st.write(f"Average Score: {result['overall_score']}")
+        
+        # Create and display radar chart
+        st.subheader("Score Distribution")
+        try:
+            fig = self.create_radar_chart(result['scores'])
+            st.plotly_chart(fig)
+        except Exception as e:
+            st.error(f"Error creating radar chart: {str(e)}")
+
+        fig1 = self.create_level_radar_chart(result['scores'])
+        fig2 = self.create_condition_radar_chart(result['scores'])
+        st.plotly_chart(fig1)
+        st.plotly_chart(fig2)
+
+        fig3 = self.create_merged_level_condition_radar(result['scores'])
+        st.plotly_chart(fig3) 
@@ -1,11 +1,18 @@
 import streamlit as st
 import sys
-import tiktoken
+import pandas as pd
 import os
-import pickle
-from datetime import datetime
+import time
 import traceback
 
+# Documents up to this size are evaluated in one streamed prompt; longer ones chunk-wise with a tree reduce
+SINGLE_PROMPT_TOKENS = 100_000
+MAX_DOCUMENT_TOKENS = 2_000_000
+# Every chunk re-sends the ~10k-token framework, so long documents use larger chunks than
+# process_long_document's 2000-token default: a tenth of the calls and far fewer framework tokens
+LONG_DOCUMENT_CHUNK_TOKENS = 20_000
+
+
 def render_dataframe(df):
     st.markdown(
         '<style>table {word-break: break-word !important; white-space: pre-line !important; max-width: 1400px !important;} td {max-width: 600px; word-break: break-word !important; white-space: pre-line !important;}</style>' +
@@ -14,135 +21,127 @@ def render_dataframe(df):
     )
 
 def save_case_cache(case_name, score, table_html):
-    cache_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'case_cache.pkl')
-    if os.path.exists(cache_file):
-        with open(cache_file, 'rb') as f:
-            cache = pickle.load(f)
-    else:
-        cache = {}
-    cache[case_name] = {
-        'score': score,
-        'table_html': table_html,
-        'upload_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
-    with open(cache_file, 'wb') as f:
-        pickle.dump(cache, f)
+    case_store.save_case(case_name, score, table_html)
 
 st.set_page_config(page_title="Case Evaluation", layout="wide")
 st.title("Case Evaluation")
 
-# Initialize services only when needed
+# Initialize services only when needed; they are process-wide singletons shared by all sessions
+services_started = time.perf_counter()
 try:
-    from doc_assistant.document_processor import DocumentProcessor
-    from doc_assistant.llm_service import LLMService, EvaluationVisualizer
-    
-    if 'document_processor' not in st.session_state:
-        st.session_state.document_processor = DocumentProcessor()
-    if 'llm_service' not in st.session_state:
-        st.session_state.llm_service = LLMService()
-    if 'visualizer' not in st.session_state:
-        st.session_state.visualizer = EvaluationVisualizer()
+    from doc_assistant.services import (
+        get_document_processor, get_llm_service, get_visualizer, get_case_store, startup_report
+    )
+    from doc_assistant.pipeline import iter_chunks, iter_segments, read_prefix
+    from doc_assistant.evaluation_table import result_to_dataframe, structured_to_result
+
+    document_processor = get_document_processor()
+    llm_service = get_llm_service()
+    visualizer = get_visualizer()
+    case_store = get_case_store()
 except Exception as e:
     st.error(f"Error initializing services: {str(e)}")
     st.text(traceback.format_exc())
     st.stop()
 
+with st.sidebar.expander("Startup timing"):
+    st.write(f"Services ready in {time.perf_counter() - services_started:.3f}s on this run")
+    for service, seconds in startup_report():
+        st.write(f"{service}: {seconds:.3f}s (first load)")
+
 st.header("File Upload")
 uploaded_files = st.file_uploader("Upload Case Documents", type=['txt', 'docx', 'pdf'], accept_multiple_files=True)
 case_name = st.text_input("Enter a unique case name (used as identifier)")
 evaluate_clicked = st.button("Evaluate")
+# The document only lives for this run; nothing large is kept in session state
+document_text, document_tokens = None, 0
 if uploaded_files and case_name and evaluate_clicked:
     try:
         # Check case name uniqueness
-        cache_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'case_cache.pkl')
-        if os.path.exists(cache_file):
-            with open(cache_file, 'rb') as f:
-                cache = pickle.load(f)
-        else:
-            cache = {}
-        if case_name in cache:
+        if case_store.exists(case_name):
             st.error("Case name already exists. Please enter a unique name.")
             st.stop()
-        # Concatenate all file contents
-        processed_text = ""
-        for uploaded_file in uploaded_files:
-            file_type = uploaded_file.name.split('.')[-1].lower()
-            file_content = uploaded_file.read()
-            processed_text += st.session_state.document_processor.process_user_document(file_content, file_type) + "\n\n"
-        st.session_state.current_doc = processed_text
-        # Check token count
-        enc = tiktoken.encoding_for_model('gpt-4o-mini')
-        total_tokens = len(enc.encode(processed_text))
-        max_tokens = 100_000
-        if total_tokens > max_tokens:
-            st.error(f"Document exceeds maximum token limit ({max_tokens:,} tokens). Current document has {total_tokens:,} tokens. Please upload a shorter document.")
+        # Stream the text of all files in upload order; later files are extracted while earlier ones are read
+        segments = iter_segments(document_processor, [
+            (uploaded_file.name.split('.')[-1].lower(), uploaded_file.read()) for uploaded_file in uploaded_files
+        ])
+        # Count tokens while reading; stop as soon as the ceiling is passed, before anything is sent to the LLM
+        document_text, document_tokens, remaining_segments = read_prefix(
+            segments, MAX_DOCUMENT_TOKENS, model_name='gpt-4o-mini'
+        )
+        if remaining_segments is not None:
+            segments.close()
+            st.error(f"Document exceeds maximum token limit ({MAX_DOCUMENT_TOKENS:,} tokens). Please upload a shorter document.")
             st.stop()
+        if document_tokens <= SINGLE_PROMPT_TOKENS:
+            report = document_processor.prompt_builder.token_report(document_text, document_tokens=document_tokens)
+            st.caption(f"Prompt size: {report['framework_tokens']:,} framework tokens + {report['document_tokens']:,} document tokens "
+                       f"({report['framework_ratio']:.0%} framework)")
+        else:
+            st.caption(f"Document exceeds {SINGLE_PROMPT_TOKENS:,} tokens; evaluating it in chunks of up to "
+                       f"{LONG_DOCUMENT_CHUNK_TOKENS:,} tokens")
     except Exception as e:
         st.error(f"Error processing document: {str(e)}")
         st.stop()
 st.header("Evaluation Results")
-if uploaded_files and case_name and evaluate_clicked and 'current_doc' in st.session_state:
+if uploaded_files and case_name and evaluate_clicked and document_text is not None:
     with st.spinner("Evaluating..."):
         try:
-            # Short document, single chunk evaluation
-            prompt = st.session_state.document_processor.prepare_prompt(
-                st.session_state.current_doc
-            )
-            result = st.session_state.llm_service.get_evaluation(prompt)
+            table_slot = st.empty()
+            chart_slot = st.empty()
+            result = None
+            if document_tokens <= SINGLE_PROMPT_TOKENS:
+                # Short document, single chunk evaluation streamed into the table and the hallmark radar chart
+                prompt = document_processor.prepare_prompt(document_text)
+                header, rows, result = None, [], None
+                prompt_tokens = document_processor.prompt_builder.framework_tokens + document_tokens
+                for kind, payload in llm_service.stream_evaluation(prompt, prompt_tokens=prompt_tokens):
+                    if kind == 'header':
+                        header = payload
+                    elif kind == 'row':
+                        rows.append(payload)
+                        with table_slot.container():
+                            render_dataframe(pd.DataFrame(rows, columns=header))
+                    elif kind == 'scores':
+                        chart_slot.plotly_chart(
+                            visualizer.create_radar_chart(payload, height=720, width=960)
+                        )
+                    elif kind == 'result':
+                        result = payload
+            else:
+                # Long document: chunks are evaluated in parallel as they are cut, then each hallmark's notes
+                # are merged level by level
+                chunks = iter_chunks(
+                    [document_text], max_tokens=LONG_DOCUMENT_CHUNK_TOKENS, model_name='gpt-4o-mini',
+                    content_defined=True
+                )
+                scores, justifications, indicators = document_processor.process_long_document(
+                    chunks, llm_service
+                )
+                result = structured_to_result({'hallmarks': [
+                    {'title': h, 'score': score, 'justification': justifications.get(h, ''),
+                     'indicators': indicators.get(h, '')}
+                    for h, score in scores.items()
+                ]})
+            chart_slot.empty()
             if result:
-                import pandas as pd
-                import re
-                table_md = result['table']
-                # Split the table into lines and remove empty lines
-                lines = [line.rstrip() for line in table_md.split('\n') if line.strip()]
-                # Get header
-                header_line = lines[0]
-                header = [h.strip() for h in header_line.split('|')[1:-1]]
-                # Skip the separator line (second line)
-                data_lines = lines[2:]
-                data = []
-                buffer = []
-                for line in data_lines:
-                    if line.startswith('|'):
-                        if buffer:
-                            row_str = '\n'.join(buffer)
-                            cols = [c.strip() for c in row_str.split('|')[1:-1]]
-                            cols = [c.replace('\n', '; ') for c in cols]
-                            if len(cols) < len(header):
-                                cols += [''] * (len(header) - len(cols))
-                            elif len(cols) > len(header):
-                                cols = cols[:len(header)]
-                            if any(c for c in cols):
-                                data.append(cols)
-                            buffer = []
-                    buffer.append(line)
-                if buffer:
-                    row_str = '\n'.join(buffer)
-                    cols = [c.strip() for c in row_str.split('|')[1:-1]]
-                    cols = [c.replace('\n', '; ') for c in cols]
-                    if len(cols) < len(header):
-                        cols += [''] * (len(header) - len(cols))
-                    elif len(cols) > len(header):
-                        cols = cols[:len(header)]
-                    if any(c for c in cols):
-                        data.append(cols)
-                df = pd.DataFrame(data, columns=header)
-                df = df.dropna(how='all')
+                df = result_to_dataframe(result)
                 table_html = df.to_html(index=False, escape=False)
-                render_dataframe(df)
+                with table_slot.container():
+                    render_dataframe(df)
                 st.subheader("Overall Score")
                 st.write(f"Average Score: {result['overall_score']}")
                 if isinstance(result['scores'], dict):
                     st.subheader("Score Distribution (Hallmarks)")
-                    fig = st.session_state.visualizer.create_radar_chart(result['scores'], height=720, width=960)
+                    fig = visualizer.create_radar_chart(result['scores'], height=720, width=960)
                     st.plotly_chart(fig)
                     st.subheader("Score Distribution (Levels & Conditions)")
                     col1, col2 = st.columns(2)
                     with col1:
-                        fig1 = st.session_state.visualizer.create_level_radar_chart(result['scores'], height=600, width=900)
+                        fig1 = visualizer.create_level_radar_chart(result['scores'], height=600, width=900)
                         st.plotly_chart(fig1)
                     with col2:
-                        fig2 = st.session_state.visualizer.create_condition_radar_chart(result['scores'], height=600, width=900)
+                        fig2 = visualizer.create_condition_radar_chart(result['scores'], height=600, width=900)
                         st.plotly_chart(fig2)
                 else:
                     st.error("LLM returned scores in incorrect format. Please check LLM output format.")
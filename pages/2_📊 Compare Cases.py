@@ -1,9 +1,10 @@
 import streamlit as st
-import os
-import pickle
 import pandas as pd
-import json
-import plotly.graph_objects as go
+from doc_assistant.case_browser import case_browser
+from doc_assistant.framework import get_framework
+from doc_assistant.palette import score_styles
+from doc_assistant.services import get_case_store, get_visualizer
+from doc_assistant.visualizer import COMPARISON_VIEWS
 
 st.set_page_config(page_title="Score Comparison", layout="wide")
 
@@ -20,74 +21,26 @@ st.markdown('''
     </style>
 ''', unsafe_allow_html=True)
 
-cache_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'case_cache.pkl')
-if os.path.exists(cache_file):
-    with open(cache_file, 'rb') as f:
-        cache = pickle.load(f)
-else:
-    cache = {}
+store = get_case_store()
 
 # More academic title
 st.markdown("<h1 style='text-align: left;'>Systemic Investing Hallmark Score Comparison</h1>", unsafe_allow_html=True)
 
-# Read group mapping
-mapping_path = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'input_files', 'system_change_level_to_hallmarks.json'))
-if os.path.exists(mapping_path):
-    with open(mapping_path, 'r', encoding='utf-8') as f:
-        group_map = json.load(f)
-else:
-    group_map = {}
-
-# Reverse mapping: hallmark -> group
-hallmark_to_group = {}
-for group, hallmarks in group_map.items():
-    for h in hallmarks:
-        hallmark_to_group[h] = group
-
-# Color mapping
-import matplotlib
-from matplotlib import cm
-from matplotlib.colors import Normalize, to_hex
+# Group mapping (hallmark -> system change level) from the shared framework registry
+hallmark_to_group = dict(get_framework().hallmark_to_level)
 
-group_cmap = {
-    "Transformational Change (implicit)": "YlOrBr",
-    "Relational Change(semi-explicit)": "PuBu",
-    "Structural Change(explicit)": "BuGn"
-}
-
-def multi_group_color(val, col, vmin, vmax, cmap_name):
-    if pd.isna(val):
-        return ''
-    try:
-        v = float(val)
-    except:
-        return ''
-    norm = Normalize(vmin=vmin, vmax=vmax)
-    cmap = cm.get_cmap(cmap_name)
-    color = to_hex(cmap(norm(v)))
-    return f'background-color: {color};'
-
-if not cache:
+if not store.count():
     st.info("No cached cases found.")
 else:
-    case_names = list(cache.keys())
-    selected = st.multiselect("Select cases to compare", case_names)
+    selected = case_browser(store, 'compare', multi=True)
     if selected:
-        scores = {name: cache[name]['score'] for name in selected}
+        scores = store.get_scores(selected)
         df = pd.DataFrame(scores).T
         for col in df.columns:
             df[col] = pd.to_numeric(df[col], errors='coerce')
         df = df.round(1)
-        # Group coloring, vmin=0, vmax=20
-        def style_func(row):
-            styles = []
-            for col, val in row.items():
-                group = hallmark_to_group.get(col, None)
-                cmap_name = group_cmap.get(group, "Greys")
-                vmin, vmax = 0, 20
-                styles.append(multi_group_color(val, col, vmin, vmax, cmap_name))
-            return styles
-        styled_df = df.style.apply(style_func, axis=1).format('{:.1f}')
+        # Group coloring, vmin=0, vmax=20, mapped a column at a time through precomputed palettes
+        styled_df = df.style.apply(score_styles, axis=None, hallmark_to_group=hallmark_to_group).format('{:.1f}')
         # Custom table header style, fixed width and automatic line wrapping
         st.markdown(
             '''<style>
@@ -105,5 +58,24 @@ else:
             </style>''', unsafe_allow_html=True
         )
         st.markdown(styled_df.to_html(escape=False), unsafe_allow_html=True)
+
+        # Radar comparison: overlay (percentile bands for large selections) or a paged grid per case
+        st.subheader("Radar Comparison")
+        visualizer = get_visualizer()
+        chart_col, view_col = st.columns(2)
+        mode = chart_col.radio("Chart", ["Overlay", "Small multiples"], horizontal=True)
+        view_label = view_col.radio("Dimensions", list(COMPARISON_VIEWS.values()), horizontal=True)
+        view = next(k for k, label in COMPARISON_VIEWS.items() if label == view_label)
+        if mode == "Overlay":
+            st.plotly_chart(visualizer.create_comparison_radar(scores, view=view), use_container_width=True)
+        else:
+            per_page = 24
+            pages = -(-len(scores) // per_page)
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+            names = list(scores)[(page - 1) * per_page:page * per_page]
+            st.plotly_chart(
+                visualizer.create_small_multiples({n: scores[n] for n in names}, view=view),
+                use_container_width=True
+            )
     else:
         st.info("Please select at least one case.") 
\ No newline at end of file
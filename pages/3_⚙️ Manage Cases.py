@@ -1,7 +1,8 @@
 import streamlit as st
 import os
-import pickle
 import pandas as pd
+from doc_assistant.case_browser import case_browser
+from doc_assistant.services import get_case_store
 
 st.set_page_config(page_title="Manage Cases", layout="wide")
 
@@ -14,12 +15,7 @@ st.markdown('''
     </style>
 ''', unsafe_allow_html=True)
 
-cache_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache', 'case_cache.pkl')
-if os.path.exists(cache_file):
-    with open(cache_file, 'rb') as f:
-        cache = pickle.load(f)
-else:
-    cache = {}
+store = get_case_store()
 
 # Record the last selected case, reset all delete_mode when switching
 if 'last_selected_case' not in st.session_state:
@@ -29,11 +25,11 @@ if 'delete_success' not in st.session_state:
 
 st.markdown("<h1 style='text-align: left;'>Manage Evaluated Cases</h1>", unsafe_allow_html=True)
 
-if not cache:
+if not store.count():
     st.info("No cached cases found.")
 else:
-    case_names = list(cache.keys())
-    selected_case = st.selectbox("Select a case to manage", case_names)
+    # Keep a renamed case selected, even when the filters or sort order would move it off the current page
+    selected_case = case_browser(store, 'manage', preselect=st.session_state.pop('renamed_case', None))
     # Reset all delete_mode when switching case
     if st.session_state['last_selected_case'] != selected_case:
         for k in list(st.session_state.keys()):
@@ -51,12 +47,11 @@ else:
         with col1:
             if st.button("Rename"):
                 if new_name != selected_case:
-                    if new_name in cache:
+                    if store.exists(new_name):
                         st.error(f"Case name '{new_name}' already exists.")
                     else:
-                        cache[new_name] = cache.pop(selected_case)
-                        with open(cache_file, 'wb') as f:
-                            pickle.dump(cache, f)
+                        store.rename_case(selected_case, new_name)
+                        st.session_state['renamed_case'] = new_name
                         st.success(f"Renamed '{selected_case}' to '{new_name}'")
                         st.experimental_rerun()
         with col2:
@@ -69,9 +64,7 @@ else:
                 confirm_col, cancel_col = st.columns([1,1], gap="small")
                 with confirm_col:
                     if st.button("Confirm", key=f"confirm_{selected_case}"):
-                        cache.pop(selected_case)
-                        with open(cache_file, 'wb') as f:
-                            pickle.dump(cache, f)
+                        store.delete_case(selected_case)
                         st.session_state['delete_success'] = f"Deleted '{selected_case}'"
                         st.session_state[f'delete_mode_{selected_case}'] = False
                         st.experimental_rerun()
@@ -80,6 +73,7 @@ else:
                         st.session_state[f'delete_mode_{selected_case}'] = False
                         st.experimental_rerun()
         # Display the cached table for the selected case
-        if selected_case in cache and 'table_html' in cache[selected_case]:
+        table_html = store.get_table_html(selected_case)
+        if table_html:
             st.subheader("Cached Table Preview")
-            st.markdown(cache[selected_case]['table_html'], unsafe_allow_html=True) 
\ No newline at end of file
+            st.markdown(table_html, unsafe_allow_html=True) 
\ No newline at end of file